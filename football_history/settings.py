@@ -94,6 +94,20 @@ DATABASES = {
 }
 
 
+# Cache des statistiques et version des données (matches.caching). Les imports
+# tournent dans un autre processus que le serveur web : le cache doit être
+# partagé entre processus. FileBasedCache le fait sans Redis ; DatabaseCache
+# (après `python manage.py createcachetable`) aussi. LocMemCache est propre à
+# chaque processus : la version incrémentée par un import n'y serait jamais vue.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'data' / 'cache' / 'django',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Match, MatchDay, Team, League, Season, LeagueSeason, TeamSeason
+from .models import Match, MatchDay, Team, League, Season, LeagueSeason, TeamSeason, TeamStanding
 from django import forms
 from django.forms.widgets import TimeInput
 from django.utils.safestring import mark_safe
@@ -129,4 +129,19 @@ class LeagueSeasonAdmin(admin.ModelAdmin):
 @admin.register(Season)
 class SeasonAdmin(admin.ModelAdmin):
     list_display = ("season_name", "start_date", "end_date")
-    search_fields = ["season_name"]
\ No newline at end of file
+    search_fields = ["season_name"]
+
+# Administration du classement matérialisé (lecture seule : tenu à jour par les matchs)
+@admin.register(TeamStanding)
+class TeamStandingAdmin(admin.ModelAdmin):
+    list_display = ["team", "league_season", "played", "wins", "draws", "losses",
+                    "goals_for", "goals_against", "points"]
+    list_filter = ["league_season__league", "league_season__season"]
+    list_select_related = ["team", "league_season__league", "league_season__season"]
+    ordering = ["league_season", "-points"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,19 +1,134 @@
 from rest_framework import viewsets, filters
-from .models import Team, League, Match
-from .serializers import TeamSerializer, LeagueSerializer, MatchSerializer
+from .models import Team, League, LeagueSeason, Match
+from .serializers import TeamSerializer, LeagueSerializer, MatchSerializer, parse_field_options
 import django_filters.rest_framework as df_filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+import hashlib
+import math
+from django.http import StreamingHttpResponse
+from .caching import get_data_modified, get_data_version
+from .export import EXPORT_FORMATS, csv_lines, export_rows, ndjson_lines
+from .pagination import MatchPagination
+from .search import search_index_available, search_matches_queryset
+from .standings import compute_over_under, compute_standings, get_league_table
 
-class TeamViewSet(viewsets.ReadOnlyModelViewSet):
+class _NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag et Last-Modified dérivés de la version des données : une requête GET dont
+    If-None-Match / If-Modified-Since correspond reçoit un 304 dès initial(), avant
+    tout queryset ou sérialisation. La version est relue à chaque requête dans le
+    cache partagé entre processus (settings.CACHES) : un import la change aussitôt.
+    """
+
+    def get_etag(self, request):
+        # Même URL (paramètres compris) et même format de rendu, même version des données
+        raw = f"{get_data_version()}|{request.get_full_path()}|{request.accepted_renderer.format}"
+        return quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._conditional = None
+        if request.method in ('GET', 'HEAD'):
+            self._conditional = (self.get_etag(request), get_data_modified())
+            response = get_conditional_response(
+                request, etag=self._conditional[0], last_modified=self._conditional[1]
+            )
+            if response is not None:
+                raise _NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        conditional = getattr(self, '_conditional', None)
+        if conditional and response.status_code in (200, 304):
+            response['ETag'] = conditional[0]
+            response['Last-Modified'] = http_date(conditional[1])
+        return response
+
+
+class FieldOptionsMixin:
+    """
+    ?fields= / ?expand= / ?flat=1 sur les vues en lecture : en mode plat, équipes et ligues
+    référencées par la page sont renvoyées une seule fois dans un dictionnaire `included`.
+    """
+
+    @property
+    def field_options(self):
+        if not hasattr(self, '_field_options'):
+            self._field_options = parse_field_options(self.request.query_params)
+        return self._field_options
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['field_options'] = self.field_options
+        return context
+
+    def is_side_loaded(self, name):
+        """La relation est rendue en id (ni développée par expand, ni exclue par fields)"""
+        options = self.field_options
+        return name not in options['expand'] and (not options['fields'] or name in options['fields'])
+
+    def get_included(self, objects):
+        """Équipes et ligues distinctes référencées par les objets (voir les vues)"""
+        return {}
+
+    def _side_load(self, teams, leagues):
+        """Sérialise une fois chaque équipe (ligue en id) et chaque ligue"""
+        context = {'request': self.request, 'field_options': {'fields': set(), 'expand': set(), 'flat': True}}
+        return {
+            'teams': {str(team.pk): TeamSerializer(team, context=context).data for team in teams},
+            'leagues': {str(league.pk): LeagueSerializer(league, context=context).data for league in leagues},
+        }
+
+    def list(self, request, *args, **kwargs):
+        if not self.field_options['flat']:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+        data = self.get_serializer(objects, many=True).data
+        if page is None:
+            return Response({'results': data, 'included': self.get_included(objects)})
+        response = self.get_paginated_response(data)
+        response.data['included'] = self.get_included(objects)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        data = self.get_serializer(instance).data
+        if self.field_options['flat']:
+            data['included'] = self.get_included([instance])
+        return Response(data)
+
+
+class TeamViewSet(ConditionalGetMixin, FieldOptionsMixin, viewsets.ReadOnlyModelViewSet):
   queryset = Team.objects.select_related('league').all()
   serializer_class = TeamSerializer
   filter_backends = [filters.SearchFilter, filters.OrderingFilter]
   search_fields = ['team_name']
   ordering_fields = ['team_name']
 
-class LeagueViewSet(viewsets.ReadOnlyModelViewSet):
+  def get_included(self, objects):
+    if not self.is_side_loaded('league'):
+      return {}
+    leagues = {team.league_id: team.league for team in objects if team.league_id}
+    return self._side_load([], leagues.values())
+
+class LeagueViewSet(ConditionalGetMixin, FieldOptionsMixin, viewsets.ReadOnlyModelViewSet):
   queryset = League.objects.all()
   serializer_class = LeagueSerializer
   
@@ -32,121 +147,183 @@ class MatchFilter(df_filters.FilterSet):
     def filter_by_team(self, queryset, name, value):
         return queryset.filter(Q(team_home__id=value) | Q(team_away__id=value))
 
-class MatchViewSet(viewsets.ReadOnlyModelViewSet):
+class MatchSearchFilter(filters.SearchFilter):
+    """SearchFilter servi par l'index plein texte FTS5 (fuzzy=1 : trigrammes), repli sur search_fields"""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not search_index_available():
+            return super().filter_queryset(request, queryset, view)
+        fuzzy = request.query_params.get('fuzzy', '') in ('1', 'true')
+        return search_matches_queryset(queryset, ' '.join(terms), fuzzy=fuzzy)
+
+class MatchViewSet(ConditionalGetMixin, FieldOptionsMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Match.objects.select_related(
-        'team_home', 'team_away', 'day__league_season__league', 'day__league_season__season'
+        'team_home__league', 'team_away__league', 'day__league_season__league', 'day__league_season__season'
     ).filter(score_home__isnull=False, score_away__isnull=False).all()
     serializer_class = MatchSerializer
+    pagination_class = MatchPagination  # pagination=cursor : pages par curseur sur (match_date, id)
     filterset_class = MatchFilter
-    filter_backends = (df_filters.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (df_filters.DjangoFilterBackend, MatchSearchFilter, filters.OrderingFilter)
     search_fields = ('team_home__team_name', 'team_away__team_name', 'day__league_season__league__league_name')
     ordering_fields = ('match_date', 'team_home__team_name')
     ordering = ('-match_date',)
 
-    @action(detail=False, methods=['get'], url_path='total_goals')
-    def total_goals(self, request):
+    def get_included(self, objects):
+        teams, leagues = {}, {}
+        for match in objects:
+            for side in ('team_home', 'team_away'):
+                team = getattr(match, side)
+                if not self.is_side_loaded(side):
+                    continue
+                teams[team.pk] = team
+                if team.league_id:
+                    leagues[team.league_id] = team.league
+            if self.is_side_loaded('day') and match.day and match.day.league_season_id:
+                league = match.day.league_season.league
+                leagues[league.pk] = league
+        return self._side_load(teams.values(), leagues.values())
+
+    @action(detail=False, methods=['get'], url_path='standings')
+    def standings(self, request):
         """
-        Retourne JSON listant pour chaque équipe :
-        - gp : matches joués
-        - over_1_5 : matches où l'équipe a marqué > 1.5 buts
-        - pct : pourcentage over_1_5 / gp * 100
+        Retourne le classement (une requête groupée) : rank, team_id, team_name,
+        played, wins, draws, losses, goals_for, goals_against, goal_difference, xg_for, xg_against, points.
+        Avec seulement league et season, lit le classement matérialisé (TeamStanding).
         Filtrable via les mêmes query params que MatchViewSet (league, season, match_date_after/before, etc).
         """
-        # apply DRF filters (filterset/search/ordering) first
-        matches_qs = self.filter_queryset(self.get_queryset()).filter(
-            score_home__isnull=False, score_away__isnull=False
-        )
-
-        teams = Team.objects.all().order_by('team_name')
-        results = []
-
-        for team in teams:
-            gp_home = matches_qs.filter(team_home=team).count()
-            gp_away = matches_qs.filter(team_away=team).count()
-            gp = gp_home + gp_away
+        params = set(request.query_params) - {'format'}
+        if params == {'league', 'season'}:
+            # Ligue-saison complète : lecture du classement matérialisé (une requête indexée)
+            league_season = LeagueSeason.objects.filter(
+                league__league_name__iexact=request.query_params['league'],
+                season__season_name__iexact=request.query_params['season'],
+            ).first()
+            table = get_league_table(league_season) if league_season else []
+            return Response({'data': [
+                {
+                    'rank': rank, 'team_id': row.team_id, 'team_name': row.team.team_name,
+                    'played': row.played, 'wins': row.wins, 'draws': row.draws, 'losses': row.losses,
+                    'goals_for': row.goals_for, 'goals_against': row.goals_against,
+                    'goal_difference': row.goal_difference,
+                    'xg_for': round(row.xG_for, 2), 'xg_against': round(row.xG_against, 2),
+                    'points': row.points,
+                }
+                for rank, row in enumerate(table, start=1)
+            ]})
 
-            over_home = matches_qs.filter(team_home=team, score_home__gt=1.5).count()
-            over_away = matches_qs.filter(team_away=team, score_away__gt=1.5).count()
-            over = over_home + over_away
+        matches_qs = self.filter_queryset(self.get_queryset())
+        return Response({'data': compute_standings(matches_qs)})
 
-            pct = round((over / gp) * 100, 2) if gp > 0 else 0.0
-
-            results.append({
-                'team_id': team.id,
-                'team_name': team.team_name,
-                'gp': gp,
-                'over_1_5': over,
-                'pct': pct,
-            })
-
-        return Response({'data': results})
-    
-    @action(detail=False, methods=['get'], url_path='total_goals_home')
-    def total_goals_home(self, request):
+    @action(detail=False, methods=['get'], url_path='head_to_head')
+    def head_to_head(self, request):
         """
-        Retourne JSON listant pour chaque équipe :
-        - gp : matches joués à domicile
-        - over_1_5 : matches où l'équipe a marqué > 1.5 buts à domicile
-        - pct : pourcentage over_1_5 / gp * 100
+        Retourne toutes les confrontations entre team_a et team_b (ids), quel que soit
+        le côté, avec le bilan : matches, victoires de chaque équipe, nuls, buts et xG.
         Filtrable via les mêmes query params que MatchViewSet (league, season, match_date_after/before, etc).
         """
-        # apply DRF filters (filterset/search/ordering) first
-        matches_qs = self.filter_queryset(self.get_queryset()).filter(
-            score_home__isnull=False, score_away__isnull=False
-        )
-
-        teams = Team.objects.all().order_by('team_name')
-        results = []
+        try:
+            team_a = int(request.query_params['team_a'])
+            team_b = int(request.query_params['team_b'])
+        except (KeyError, ValueError):
+            return Response({'detail': 'team_a and team_b must be team ids'}, status=400)
+        if team_a == team_b:
+            return Response({'detail': 'team_a and team_b must be different teams'}, status=400)
+        teams = {team.pk: team for team in Team.objects.filter(pk__in=[team_a, team_b])}
+        if len(teams) != 2:
+            return Response({'detail': 'Unknown team'}, status=404)
 
-        for team in teams:
-            gp_home = matches_qs.filter(team_home=team).count()
-            gp = gp_home
+        # Servi par l'index sur la paire non orientée (plus petit id, plus grand id)
+        matches_qs = self.filter_queryset(self.get_queryset()).annotate(
+            pair_low=Least('team_home', 'team_away'), pair_high=Greatest('team_home', 'team_away'),
+        ).filter(pair_low=min(team_a, team_b), pair_high=max(team_a, team_b)).order_by('-match_date')
 
-            over_home = matches_qs.filter(team_home=team, score_home__gt=1.5).count()
-            over = over_home
-            pct = round((over / gp) * 100, 2) if gp > 0 else 0.0
+        # Buts / xG vus depuis team_a, en une requête d'agrégation conditionnelle
+        a_is_home = Q(team_home_id=team_a)
+        goals_a = Case(When(a_is_home, then=F('score_home')), default=F('score_away'))
+        goals_b = Case(When(a_is_home, then=F('score_away')), default=F('score_home'))
+        xg_a = Case(When(a_is_home, then=F('xG_home')), default=F('xG_away'))
+        xg_b = Case(When(a_is_home, then=F('xG_away')), default=F('xG_home'))
+        summary = matches_qs.order_by().aggregate(
+            matches=Count('id'),
+            team_a_wins=Count('id', filter=Q(a_is_home, score_home__gt=F('score_away')) | Q(~a_is_home, score_away__gt=F('score_home'))),
+            team_b_wins=Count('id', filter=Q(a_is_home, score_home__lt=F('score_away')) | Q(~a_is_home, score_away__lt=F('score_home'))),
+            draws=Count('id', filter=Q(score_home=F('score_away'))),
+            team_a_goals=Coalesce(Sum(goals_a), 0),
+            team_b_goals=Coalesce(Sum(goals_b), 0),
+            team_a_xg=Sum(xg_a),
+            team_b_xg=Sum(xg_b),
+        )
+        for key in ('team_a_xg', 'team_b_xg'):
+            summary[key] = round(summary[key], 2) if summary[key] is not None else None
 
-            results.append({
-                'team_id': team.id,
-                'team_name': team.team_name,
-                'gp': gp,
-                'over_1_5': over,
-                'pct': pct,
-            })
+        return Response({
+            'team_a': {'id': team_a, 'team_name': teams[team_a].team_name},
+            'team_b': {'id': team_b, 'team_name': teams[team_b].team_name},
+            'summary': summary,
+            'matches': self.get_serializer(matches_qs, many=True).data,
+        })
 
-        return Response({'data': results})
-    
-    @action(detail=False, methods=['get'], url_path='total_goals_away')
-    def total_goals_away(self, request):
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
         """
-        Retourne JSON listant pour chaque équipe :
-        - gp : matches joués à l'extérieur
-        - over_1_5 : matches où l'équipe a marqué > 1.5 buts à l'extérieur
-        - pct : pourcentage over_1_5 / gp * 100
+        Exporte en flux tous les matchs filtrés, sans pagination, triés par date puis id.
+        Paramètre : output (ndjson par défaut, ou csv) ; une ligne par match, relations aplaties.
         Filtrable via les mêmes query params que MatchViewSet (league, season, match_date_after/before, etc).
         """
-        # apply DRF filters (filterset/search/ordering) first
-        matches_qs = self.filter_queryset(self.get_queryset()).filter(
-            score_home__isnull=False, score_away__isnull=False
-        )
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response({'detail': f"output must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+        lines = csv_lines if output == 'csv' else ndjson_lines
+        rows = export_rows(self.filter_queryset(self.get_queryset()))
+        response = StreamingHttpResponse(lines(rows), content_type=EXPORT_FORMATS[output])
+        response['Content-Disposition'] = f'attachment; filename="matches.{output}"'
+        return response
 
-        teams = Team.objects.all().order_by('team_name')
-        results = []
+    @action(detail=False, methods=['get'], url_path='over_under')
+    def over_under(self, request):
+        """
+        Retourne JSON listant pour chaque équipe des matchs filtrés (une requête groupée) :
+        - gp : matches joués (du côté demandé)
+        - over / under : matches au-dessus / en dessous de la ligne
+        - pct : pourcentage over / gp * 100
+        Paramètres : line (défaut 1.5), side (all, home, away), metric (scored, conceded, total, btts).
+        Filtrable via les mêmes query params que MatchViewSet (league, season, match_date_after/before, etc).
+        """
+        try:
+            line = float(request.query_params.get('line', 1.5))
+        except ValueError:
+            line = None
+        if line is None or not math.isfinite(line):
+            return Response({'detail': 'line must be a number'}, status=400)
+        side = request.query_params.get('side', 'all')
+        metric = request.query_params.get('metric', 'scored')
+        try:
+            data = compute_over_under(self.filter_queryset(self.get_queryset()), line, side, metric)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=400)
+        return Response({'line': line, 'side': side, 'metric': metric, 'data': data})
 
-        for team in teams:
-            gp_away = matches_qs.filter(team_away=team).count()
-            gp = gp_away
+    def _over_1_5(self, side):
+        """Format historique des actions total_goals* : gp, over_1_5, pct par équipe"""
+        data = compute_over_under(self.filter_queryset(self.get_queryset()), 1.5, side, 'scored')
+        return Response({'data': [
+            {'team_id': row['team_id'], 'team_name': row['team_name'], 'gp': row['gp'],
+             'over_1_5': row['over'], 'pct': row['pct']}
+            for row in data
+        ]})
 
-            over_away = matches_qs.filter(team_away=team, score_away__gt=1.5).count()
-            over = over_away
-            pct = round((over / gp) * 100, 2) if gp > 0 else 0.0
+    @action(detail=False, methods=['get'], url_path='total_goals')
+    def total_goals(self, request):
+        """Alias de over_under?line=1.5&side=all&metric=scored (over_1_5 : matches où l'équipe a marqué > 1.5 buts)"""
+        return self._over_1_5('all')
 
-            results.append({
-                'team_id': team.id,
-                'team_name': team.team_name,
-                'gp': gp,
-                'over_1_5': over,
-                'pct': pct,
-            })
+    @action(detail=False, methods=['get'], url_path='total_goals_home')
+    def total_goals_home(self, request):
+        """Alias de over_under?line=1.5&side=home&metric=scored"""
+        return self._over_1_5('home')
 
-        return Response({'data': results})
\ No newline at end of file
+    @action(detail=False, methods=['get'], url_path='total_goals_away')
+    def total_goals_away(self, request):
+        """Alias de over_under?line=1.5&side=away&metric=scored"""
+        return self._over_1_5('away')
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Cache des réponses de statistiques, invalidé par une version globale des données.
+
+Chaque écriture de Match, MatchDay, Team (et des ligues / saisons), y compris
+les imports en masse, incrémente la version : les clés de cache la contiennent,
+donc les anciennes entrées ne sont plus jamais lues et expirent d'elles-mêmes.
+Seules les opérations get / set / add / incr sont utilisées, ce qui fonctionne
+avec les backends fichier et base de données de Django (sans Redis). La version
+doit être partagée entre processus, les imports tournant à part du serveur web :
+le backend locmem ne convient qu'à un processus unique (tests).
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+
+DATA_VERSION_KEY = 'matches:data_version'
+DATA_MODIFIED_KEY = 'matches:data_modified'  # Horodatage (secondes) de la dernière écriture
+STATS_CACHE_TIMEOUT = 60 * 60 * 24  # Les clés versionnées rendent une expiration courte inutile
+
+
+def get_data_version() -> int:
+    """Version courante des données de match"""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # Point de départ horodaté : un cache persistant vidé ne ressert pas d'anciennes clés
+        cache.add(DATA_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def get_data_modified() -> int:
+    """Date de la dernière écriture connue (timestamp), pour l'en-tête Last-Modified"""
+    modified = cache.get(DATA_MODIFIED_KEY)
+    if modified is None:
+        # Inconnue (démarrage, cache vidé) : on considère les données modifiées maintenant
+        cache.add(DATA_MODIFIED_KEY, int(time.time()), timeout=None)
+        modified = cache.get(DATA_MODIFIED_KEY)
+    return modified
+
+
+def _bump() -> None:
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        # Clé absente (cache vidé ou expiré) : repartir d'une nouvelle version
+        cache.set(DATA_VERSION_KEY, int(time.time() * 1000), timeout=None)
+    cache.set(DATA_MODIFIED_KEY, int(time.time()), timeout=None)
+
+
+def bump_data_version() -> None:
+    """Invalide toutes les réponses en cache, une fois la transaction en cours validée"""
+    transaction.on_commit(_bump)
+
+
+def normalize_params(params, keys) -> dict:
+    """Garde les paramètres utiles, sans espaces ni valeurs vides"""
+    normalized = {}
+    for key in keys:
+        value = str(params.get(key, '') or '').strip()
+        if value:
+            normalized[key] = value
+    return normalized
+
+
+def make_cache_key(prefix: str, params: dict) -> str:
+    """Clé de cache d'une réponse : préfixe, version des données et paramètres triés"""
+    query = urlencode(sorted(params.items()))
+    digest = hashlib.md5(query.encode('utf-8')).hexdigest()
+    return f"matches:{prefix}:v{get_data_version()}:{digest}"
+
+
+def get_or_compute(prefix: str, params: dict, compute, timeout: int = STATS_CACHE_TIMEOUT):
+    """Retourne la valeur en cache pour ces paramètres, ou la calcule et la met en cache"""
+    key = make_cache_key(prefix, params)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
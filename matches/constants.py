@@ -28,4 +28,37 @@ LEAGUE_COUNTRY_MAPPING = {
     'Serie A': 'Italy',
     'Ligue 1': 'France',
     # Add more mappings as needed
-}
\ No newline at end of file
+}
+
+# Mapping des noms d'équipe vers les noms de fichier de logo (import des CSV)
+TEAM_LOGO_MAPPING = {
+    "Arsenal": "Arsenal.png",
+    "Aston Villa": "Aston_Villa.png",
+    "Bournemouth": "Bournemouth.png",
+    "Brentford": "Brentford.png",
+    "Brighton & Hove Albion": "Brighton_and_Hove_Albion.png",
+    "Chelsea": "Chelsea.png",
+    "Crystal Palace": "Crystal_Palace.png",
+    "Everton": "Everton.png",
+    "Fulham": "Fulham.png",
+    "Ipswich Town": "Ipswich_Town.png",
+    "Leicester City": "Leicester_City.png",
+    "Liverpool": "Liverpool.png",
+    "Manchester City": "Manchester_City.png",
+    "Manchester United": "Manchester_United.png",
+    "Newcastle United": "Newcastle_United.png",
+    "Nottingham Forest": "Nottingham_Forest.png",
+    "Southampton": "Southampton.png",
+    "Tottenham Hotspur": "Tottenham_Hotspur.png",
+    "West Ham United": "West_Ham_United.png",
+    "Wolverhampton Wanderers": "Wolverhampton_Wanderers.png",
+}
+
+# Mapping des préfixes de nom de fichier CSV vers les pays (import des CSV)
+CSV_LEAGUE_COUNTRY_MAPPING = {
+    'Premier': 'England',
+    'LaLiga': 'Spain',
+    'Serie A': 'Italy',
+    'Bundesliga': 'Germany',
+    'Ligue 1': 'France'
+}
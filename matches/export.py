@@ -0,0 +1,69 @@
+"""Export en flux des matchs (NDJSON ou CSV), sans pagination.
+
+    rows = export_rows(filter_matches(league=1))
+    StreamingHttpResponse(ndjson_lines(rows), content_type=EXPORT_FORMATS['ndjson'])
+
+Les lignes sont lues par values() et .iterator() par paquets de EXPORT_CHUNK_SIZE :
+un export de tout l'historique tient en une requête HTTP, avec une mémoire
+constante quel que soit le nombre de matchs.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Colonne exportée -> champ (relations aplaties)
+EXPORT_COLUMNS = {
+    'id': F('id'),
+    'match_date': F('match_date'),
+    'time': F('time'),
+    'league': F('day__league_season__league__league_name'),
+    'season': F('day__league_season__season__season_name'),
+    'day_number': F('day__day_number'),
+    'team_home_id': F('team_home_id'),
+    'team_home': F('team_home__team_name'),
+    'team_away_id': F('team_away_id'),
+    'team_away': F('team_away__team_name'),
+    'score_home': F('score_home'),
+    'score_away': F('score_away'),
+    'xG_home': F('xG_home'),
+    'xG_away': F('xG_away'),
+}
+
+
+def export_rows(matches):
+    """Itère sur les matchs en dicts plats, par date puis id, sans charger tout le queryset"""
+    # Préfixe évitant les conflits entre alias et noms de champs du modèle
+    aliases = {f'export_{column}': expression for column, expression in EXPORT_COLUMNS.items()}
+    rows = matches.order_by('match_date', 'id').values(**aliases)
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {column: row[f'export_{column}'] for column in EXPORT_COLUMNS}
+
+
+def ndjson_lines(rows):
+    """Un objet JSON par ligne"""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne écrite au lieu de la stocker"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """En-tête puis une ligne CSV par match ; les valeurs manquantes sont vides"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(list(EXPORT_COLUMNS))
+    for row in rows:
+        yield writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value
+                               for value in row.values()])
@@ -0,0 +1,63 @@
+"""Facettes du formulaire de recherche : années, équipes et ligues.
+
+Les options (valeurs possibles) ne changent qu'avec les données : elles sont
+mises en cache par version des données. Les effectifs de chaque valeur pour la
+recherche en cours viennent d'une seule requête (UNION ALL de trois GROUP BY),
+elle aussi mise en cache par paramètres de recherche.
+"""
+from django.db.models import Count, F, Value
+from django.db.models.functions import ExtractYear
+
+from .caching import get_or_compute
+from .models import League, Match, Team
+
+
+def _facet_options():
+    return {
+        'years': list(
+            Match.objects.order_by().annotate(year=ExtractYear('match_date'))
+            .values_list('year', flat=True).distinct().order_by('-year')
+        ),
+        'teams': list(Team.objects.order_by('team_name').values('id', 'team_name')),
+        'leagues': list(League.objects.order_by('league_name').values('id', 'league_name')),
+    }
+
+
+def get_facet_options() -> dict:
+    """Valeurs possibles de chaque facette, recalculées seulement quand les données changent"""
+    return get_or_compute('search_facet_options', {}, _facet_options)
+
+
+def compute_facet_counts(matches) -> dict:
+    """Nombre de matchs par année, équipe et ligue pour un queryset, en une requête"""
+    matches = matches.order_by()
+    by_year = matches.values(facet=Value('year'), value=ExtractYear('match_date')).annotate(total=Count('id'))
+    by_home = matches.values(facet=Value('team'), value=F('team_home_id')).annotate(total=Count('id'))
+    by_away = matches.values(facet=Value('team'), value=F('team_away_id')).annotate(total=Count('id'))
+    by_league = matches.values(
+        facet=Value('league'), value=F('day__league_season__league_id')
+    ).annotate(total=Count('id'))
+
+    counts = {'years': {}, 'teams': {}, 'leagues': {}}
+    for row in by_year.union(by_home, by_away, by_league, all=True):
+        if row['value'] is None:
+            continue
+        bucket = counts[row['facet'] + 's']
+        # Une équipe compte ses matchs à domicile et à l'extérieur
+        bucket[row['value']] = bucket.get(row['value'], 0) + row['total']
+    return counts
+
+
+def get_search_facets(matches, params: dict) -> dict:
+    """
+    Options des facettes avec l'effectif de chaque valeur pour la recherche en cours
+
+    params sont les paramètres normalisés de la recherche (clé du cache des effectifs).
+    """
+    options = get_facet_options()
+    counts = get_or_compute('search_facet_counts', params, lambda: compute_facet_counts(matches))
+    return {
+        'years': [{'value': year, 'count': counts['years'].get(year, 0)} for year in options['years']],
+        'teams': [{**team, 'count': counts['teams'].get(team['id'], 0)} for team in options['teams']],
+        'leagues': [{**league, 'count': counts['leagues'].get(league['id'], 0)} for league in options['leagues']],
+    }
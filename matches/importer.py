@@ -0,0 +1,1171 @@
+"""Moteur d'import des données de match (CSV / Parquet) dans la base.
+
+Utilisé par le script scripts/import_data/import_data.py et par la commande
+``manage.py import_matches``. Le module suppose Django déjà configuré et
+n'ajoute aucune sortie de log : c'est à l'appelant de configurer Loguru.
+"""
+import cProfile
+import hashlib
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+from loguru import logger
+
+from .constants import CSV_LEAGUE_COUNTRY_MAPPING, TEAM_LOGO_MAPPING
+from .caching import bump_data_version
+from .logo_index import get_logo_index
+from .search import reindex_on_commit
+from .standings import add_contribution, apply_standings_delta, match_contribution
+from .models import Season, League, LeagueSeason, Team, TeamSeason, MatchDay, Match
+
+try:
+    import resource  # Unix uniquement : mesure du pic de mémoire
+except ImportError:
+    resource = None
+
+try:
+    import pyarrow.parquet as pq  # Optionnel : lecture des exports Parquet typés
+except ImportError:
+    pq = None
+
+# Constants
+DEFAULT_CSV_FILENAME = "Premier-League-2024-2025.csv"
+LOGOS_PATH = "static/logos"  # Chemin de base vers les logos
+PREMIER_LEAGUE_LOGOS_PATH = "England/Premier League"  # Chemin relatif pour Premier League
+BULK_BATCH_SIZE = 500  # Taille des lots pour bulk_create / bulk_update
+STREAM_CHUNKSIZE = 50000  # Nombre de lignes lues par morceau en mode --stream
+
+BASE_DIR = Path(settings.BASE_DIR)
+CSV_DIR = BASE_DIR / 'data' / 'raw' / 'csv'
+PARQUET_DIR = BASE_DIR / 'data' / 'raw' / 'parquet'  # Exports typés de export_data (--format parquet)
+PARQUET_CSV_SHA1_KEY = b'football_history.csv_sha1'  # Métadonnée Parquet : SHA-1 du CSV exporté avec lui
+MANIFEST_DIR = BASE_DIR / 'data' / 'manifests'  # Empreintes des lignes déjà importées
+REJECTS_DIR = BASE_DIR / 'data' / 'rejected'  # Lignes rejetées à la validation, avec leur raison
+
+# Colonnes sans lesquelles une ligne de match est rejetée
+REQUIRED_MATCH_COLUMNS = ['Home', 'Away', 'Date', 'Wk']
+
+# Colonnes normalisées prises en compte dans l'empreinte d'une ligne de match
+HASHED_COLUMNS = ['Wk', 'Date', 'Time', 'Home', 'Away', 'Score_Home', 'Score_Away', 'xG_Home', 'xG_Away']
+
+# Types des colonnes lues en mode --stream (League, Country et Season sont optionnelles,
+# pour les exports consolidés multi-ligues / multi-saisons). Les colonnes numériques
+# sont lues comme texte puis typées par validate_matches : une valeur invalide rejette
+# sa ligne au lieu de faire échouer la lecture du morceau entier.
+STREAM_DTYPES = {
+    col: 'string'
+    for col in ['Wk', 'Time', 'Home', 'Away', 'xG_Home', 'Score_Home', 'Score_Away', 'xG_Away',
+                'League', 'Country', 'Season']
+}
+
+# Champs du modèle Match réécrits par l'import en masse (la clé est date + équipes)
+MATCH_UPDATE_FIELDS = ['day', 'time', 'score_home', 'score_away', 'xG_home', 'xG_away']
+
+
+class ImportProfiler:
+    """
+    Mesure chaque étape d'un import : temps écoulé, requêtes SQL et lignes modifiées
+    
+    Désactivé par défaut : stage() ne fait alors rien. Les étapes de même nom
+    (plusieurs fichiers, plusieurs morceaux) sont cumulées.
+    """
+    
+    def __init__(self, enabled: bool = False, cprofile: bool = False):
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.stages: Dict[str, dict] = {}
+        self.profiles: Dict[str, cProfile.Profile] = {}
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Mesure le bloc de code englobé sous le nom d'étape donné"""
+        if not self.enabled:
+            yield
+            return
+        
+        stats = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "queries": 0, "rows_affected": 0})
+        # Sous SQLite, le rowcount d'un INSERT ... RETURNING n'est connu qu'après lecture des lignes
+        returning_cursors = []
+        
+        def count_queries(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            stats["queries"] += 1
+            statement = sql.lstrip().upper()
+            if statement.startswith('SELECT'):
+                return result
+            rowcount = context['cursor'].rowcount
+            if rowcount and rowcount > 0:
+                stats["rows_affected"] += rowcount
+            elif 'RETURNING' in statement:
+                returning_cursors.append(context['cursor'])
+            return result
+        
+        profile = self.profiles.setdefault(name, cProfile.Profile()) if self.cprofile else None
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            if profile:
+                profile.enable()
+            try:
+                yield
+            finally:
+                if profile:
+                    profile.disable()
+                stats["calls"] += 1
+                stats["seconds"] += time.perf_counter() - started
+                stats["rows_affected"] += sum(max(cursor.rowcount, 0) for cursor in returning_cursors)
+    
+    def report(self, json_path: Path, context: dict) -> None:
+        """Affiche le tableau des étapes et l'écrit en JSON pour comparer les versions"""
+        if not self.enabled:
+            return
+        
+        rows = [{"stage": name, **{key: round(value, 4) if isinstance(value, float) else value
+                                   for key, value in stats.items()}}
+                for name, stats in self.stages.items()]
+        total = {
+            "seconds": round(sum(row["seconds"] for row in rows), 4),
+            "queries": sum(row["queries"] for row in rows),
+            "rows_affected": sum(row["rows_affected"] for row in rows),
+        }
+        
+        logger.info("Profil de l'import :")
+        logger.info(f"  {'Étape':<20} {'Appels':>7} {'Temps (s)':>10} {'Requêtes':>9} {'Lignes':>8}")
+        for row in rows:
+            logger.info(f"  {row['stage']:<20} {row['calls']:>7} {row['seconds']:>10.3f} "
+                        f"{row['queries']:>9} {row['rows_affected']:>8}")
+        logger.info(f"  {'TOTAL':<20} {'':>7} {total['seconds']:>10.3f} "
+                    f"{total['queries']:>9} {total['rows_affected']:>8}")
+        
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump({**context, "stages": rows, "total": total}, file, ensure_ascii=False, indent=2)
+        logger.info(f"Profil JSON écrit dans {json_path}")
+    
+    def dump_slowest(self, prof_path: Path) -> None:
+        """Écrit le profil cProfile de l'étape la plus lente (lisible avec pstats / snakeviz)"""
+        if not self.enabled or not self.cprofile or not self.stages:
+            return
+        slowest = max(self.stages, key=lambda name: self.stages[name]["seconds"])
+        prof_path.parent.mkdir(parents=True, exist_ok=True)
+        self.profiles[slowest].dump_stats(str(prof_path))
+        logger.info(f"Profil cProfile de l'étape la plus lente ({slowest}) écrit dans {prof_path}")
+
+
+def extract_league_and_country(csv_filename: str) -> Tuple[str, str]:
+    """Extrait le nom de la ligue et le pays à partir du nom de fichier CSV"""
+    parts = csv_filename.split("-")
+    league_name = parts[0].strip()
+    country = None
+    
+    # Déterminer le pays en fonction du nom de la ligue
+    for league_key, country_value in CSV_LEAGUE_COUNTRY_MAPPING.items():
+        if league_key in csv_filename:
+            country = country_value
+            break
+    
+    # Si le pays est spécifié dans le nom du fichier, l'utiliser
+    if len(parts) > 2 and parts[1].strip() in ['England', 'Spain', 'Italy', 'Germany', 'France']:
+        country = parts[1].strip()
+        league_name = f"{parts[0]}"
+    else:
+        league_name = f"{parts[0]}"
+    
+    if league_name == "Premier":
+        league_name = "Premier League"
+    
+    return league_name, country
+
+
+def get_premier_league_logo_path(team_name: str) -> Optional[str]:
+    """
+    Fonction spéciale pour obtenir le chemin du logo de Premier League
+    """
+    if team_name in TEAM_LOGO_MAPPING:
+        logo_filename = TEAM_LOGO_MAPPING[team_name]
+        logo_path = f"{PREMIER_LEAGUE_LOGOS_PATH}/{logo_filename}"
+        
+        # Vérifier si le fichier existe (via l'index, sans accès disque)
+        if get_logo_index().exists(logo_path):
+            logger.info(f"Logo Premier League trouvé pour {team_name}: {logo_path}")
+            return logo_path
+    
+    return None
+
+
+def find_logo_path(entity_name: str, entity_type: str, country: str = None, league_name: str = None) -> Optional[str]:
+    """
+    Trouve le chemin du logo pour une entité (équipe ou ligue)
+    
+    Args:
+        entity_name: Nom de l'entité (équipe ou ligue)
+        entity_type: Type d'entité ('teams', 'leagues' ou 'countries')
+        country: Pays (pour les équipes)
+        league_name: Nom de la ligue (pour les équipes)
+    
+    Returns:
+        Le chemin relatif du logo s'il existe, sinon None
+    """
+    logo_index = get_logo_index()
+    
+    # Cas spécial pour Premier League
+    if country == "England" and league_name == "Premier League" and entity_type == 'teams':
+        premier_league_path = get_premier_league_logo_path(entity_name)
+        if premier_league_path:
+            return premier_league_path
+    
+    # Vérifier si nous avons une correspondance directe dans le mapping pour les équipes
+    if entity_type == 'teams' and entity_name in TEAM_LOGO_MAPPING:
+        if country and league_name:
+            logo_path = f"{entity_type}/{country}/{league_name}/{TEAM_LOGO_MAPPING[entity_name]}"
+            if logo_index.exists(logo_path):
+                logger.info(f"Logo trouvé pour {entity_name} via mapping: {logo_path}")
+                return logo_path
+        
+        # Si le chemin avec pays et ligue n'existe pas, essayer juste avec le nom du fichier
+        logo_path = f"{entity_type}/{TEAM_LOGO_MAPPING[entity_name]}"
+        if logo_index.exists(logo_path):
+            logger.info(f"Logo trouvé pour {entity_name} via mapping (chemin simple): {logo_path}")
+            return logo_path
+    
+    # Recherche par nom normalisé dans l'index (dossier de la ligue, puis tout le type d'entité)
+    logo_path = logo_index.find(entity_name, entity_type, country=country, league_name=league_name)
+    if logo_path:
+        logger.info(f"Logo trouvé pour {entity_name} via l'index des logos: {logo_path}")
+        return logo_path
+    
+    logger.warning(f"Aucun logo trouvé pour {entity_name} ({entity_type})")
+    return None
+
+
+def list_all_logos():
+    """Affiche tous les logos disponibles pour le débogage"""
+    logos_base = BASE_DIR / LOGOS_PATH
+    if not logos_base.exists():
+        logger.error(f"Dossier de logos non trouvé: {logos_base}")
+        return
+    
+    logger.info(f"Liste des logos disponibles:")
+    for rel_path in get_logo_index().paths:
+        logger.info(f"  - {rel_path}")
+
+
+def _file_sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_columnar_file(csv_path: Path) -> Optional[Path]:
+    """
+    Retourne l'export Parquet typé correspondant à un CSV, s'il existe et si pyarrow est installé
+
+    export_data (--format both) enregistre dans le Parquet l'empreinte du CSV
+    écrit en même temps : si le CSV a changé depuis, le Parquet est ignoré. Sans
+    empreinte, un Parquet plus ancien que le CSV est ignoré : il ne doit pas
+    masquer des données fraîches.
+    """
+    if pq is None:
+        return None
+    for parquet_path in (csv_path.with_suffix('.parquet'), PARQUET_DIR / f"{csv_path.stem}.parquet"):
+        if not parquet_path.exists():
+            continue
+        if csv_path.exists():
+            csv_sha1 = (pq.read_schema(parquet_path).metadata or {}).get(PARQUET_CSV_SHA1_KEY)
+            if csv_sha1 is not None and csv_sha1.decode() != _file_sha1(csv_path):
+                logger.warning(f"{csv_path.name} a changé depuis l'export de {parquet_path}, le CSV est utilisé")
+                continue
+            if csv_sha1 is None and parquet_path.stat().st_mtime < csv_path.stat().st_mtime:
+                logger.warning(f"{parquet_path} est plus ancien que {csv_path.name}, le CSV est utilisé")
+                continue
+        return parquet_path
+    return None
+
+
+def load_match_data(csv_path: Path) -> pd.DataFrame:
+    """
+    Charge les données de match brutes (conversions faites par validate_matches)
+    
+    Si un export Parquet du même nom existe, il est lu en mémoire projetée avec
+    ses types d'origine ; sinon le CSV est lu.
+    """
+    parquet_path = find_columnar_file(csv_path)
+    if parquet_path:
+        logger.info(f"Chargement du fichier Parquet : {parquet_path}")
+        matches_df = pd.read_parquet(parquet_path, engine='pyarrow', memory_map=True)
+        logger.info("Données Parquet chargées avec succès.")
+        return matches_df
+    
+    logger.info(f"Chargement du fichier CSV : {csv_path}")
+    
+    matches_df = pd.read_csv(csv_path)
+    logger.info("Données CSV chargées avec succès.")
+    
+    return matches_df
+
+
+def iter_match_chunks(csv_path: Path, chunksize: int, start_row: int = 0, columns: Optional[List[str]] = None):
+    """
+    Lit les données de match par morceaux, depuis l'export Parquet s'il existe, sinon le CSV
+    
+    Les start_row premières lignes de données sont sautées (reprise d'un import
+    interrompu) ; l'index des morceaux reste le numéro de ligne dans le fichier.
+    `columns` limite la lecture aux colonnes présentes parmi celles données.
+    """
+    parquet_path = find_columnar_file(csv_path)
+    if parquet_path:
+        logger.info(f"Lecture en continu de {parquet_path} par morceaux de {chunksize} lignes")
+        parquet_file = pq.ParquetFile(parquet_path, memory_map=True)
+        if columns is not None:
+            columns = [column for column in columns if column in parquet_file.schema_arrow.names]
+        row_offset = 0
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            batch_start, row_offset = row_offset, row_offset + batch.num_rows
+            if row_offset <= start_row:
+                continue
+            if batch_start < start_row:
+                batch = batch.slice(start_row - batch_start)
+                batch_start = start_row
+            chunk = batch.to_pandas()
+            # Index continu d'un morceau à l'autre, comme avec read_csv(chunksize=...)
+            chunk.index = pd.RangeIndex(batch_start, row_offset)
+            yield chunk
+        return
+    
+    logger.info(f"Lecture en continu de {csv_path} par morceaux de {chunksize} lignes")
+    reader = pd.read_csv(csv_path, dtype=STREAM_DTYPES, parse_dates=['Date'], chunksize=chunksize,
+                         skiprows=range(1, start_row + 1),
+                         usecols=None if columns is None else lambda column: column in columns)
+    for chunk in reader:
+        if start_row:
+            chunk.index = chunk.index + start_row
+        yield chunk
+
+
+def get_season_info(matches_df: pd.DataFrame) -> Tuple[str, str, str]:
+    """Extrait les informations de la saison à partir des données de matchs"""
+    start_date = matches_df['Date'].min().date()
+    end_date = matches_df['Date'].max().date()
+    season_name = f"{start_date.year}-{end_date.year}"
+    logger.info(f"Saison déterminée : {season_name} ({start_date} à {end_date})")
+    return season_name, start_date, end_date
+
+
+def create_or_update_team(team_name: str, league: League) -> Tuple[Team, bool]:
+    """Crée ou met à jour une équipe (avec son logo) dans la base de données"""
+    # Cas spécial pour Premier League
+    logo_path = None
+    if league.league_name == "Premier League" and league.country == "England":
+        logo_path = get_premier_league_logo_path(team_name)
+    
+    # Si pas de logo trouvé en Premier League, utiliser la recherche standard
+    if not logo_path:
+        logo_path = find_logo_path(
+            team_name, 
+            'teams', 
+            country=league.country, 
+            league_name=league.league_name
+        )
+    
+    # Créer ou mettre à jour l'équipe
+    team_obj, created = Team.objects.update_or_create(
+        team_name=team_name,
+        defaults={
+            'league': league,
+            'logo': logo_path
+        }
+    )
+    
+    if created:
+        logger.info(f"Nouvelle équipe créée : {team_name}" + (f" avec logo: {logo_path}" if logo_path else ""))
+    else:
+        logger.info(f"Équipe existante mise à jour : {team_name}" + (f" avec logo: {logo_path}" if logo_path else ""))
+    
+    return team_obj, created
+
+
+def create_or_update_teams(matches_df: pd.DataFrame, league: League) -> Tuple[Dict[str, Team], List[Tuple[str, bool]]]:
+    """Crée ou met à jour les équipes dans la base de données"""
+    # Extraire les noms uniques des équipes (domicile et extérieur)
+    home_teams = matches_df['Home'].dropna().unique()
+    away_teams = matches_df['Away'].dropna().unique()
+    unique_teams = sorted(set(home_teams) | set(away_teams))
+    
+    teams = {}
+    team_results = []
+    
+    for team_name in unique_teams:
+        if pd.isna(team_name):
+            logger.warning(f"Équipe ignorée: nom invalide (NaN)")
+            continue
+        
+        team_obj, created = create_or_update_team(team_name, league)
+        teams[team_name] = team_obj
+        team_results.append((team_name, created))
+    
+    return teams, team_results
+
+
+def create_or_update_season(season_name: str, start_date: str, end_date: str) -> Season:
+    """Crée ou met à jour la saison dans la base de données"""
+    season, created = Season.objects.update_or_create(
+        season_name=season_name,
+        defaults={'start_date': start_date, 'end_date': end_date}
+    )
+    if created:
+        logger.info(f"Nouvelle saison créée : {season_name}")
+    else:
+        logger.info(f"Saison existante mise à jour : {season_name}")
+    return season
+
+
+def create_or_update_league(league_name: str, country: Optional[str] = None) -> League:
+    """Crée ou met à jour la ligue dans la base de données"""
+    # Rechercher un logo pour cette ligue
+    logo_path = None
+    if league_name == "Premier League" and country == "England":
+        # Chemin spécifique pour la Premier League
+        specific_logo_path = f"leagues/{country}/{league_name}.png"
+        if get_logo_index().exists(specific_logo_path):
+            logo_path = specific_logo_path
+    
+    # Si pas de logo trouvé, utiliser la recherche standard
+    if not logo_path:
+        logo_path = find_logo_path(league_name, 'leagues', country=country)
+    
+    # Créer ou mettre à jour la ligue
+    league, created = League.objects.update_or_create(
+        league_name=league_name,
+        defaults={
+            'country': country,
+            'logo': logo_path
+        }
+    )
+    
+    if created:
+        logger.info(f"Nouvelle ligue créée : {league_name}" + (f" ({country})" if country else ""))
+    else:
+        logger.info(f"Ligue existante mise à jour : {league_name}")
+    return league
+
+
+def create_or_update_league_season(league: League, season: Season) -> LeagueSeason:
+    """Crée ou met à jour la relation LeagueSeason"""
+    league_season, created = LeagueSeason.objects.update_or_create(
+        league=league,
+        season=season,
+        defaults={}
+    )
+    
+    if created:
+        logger.info(f"Nouvelle relation League-Season créée : {league_season}")
+    else:
+        logger.info(f"Relation League-Season existante mise à jour : {league_season}")
+    
+    return league_season
+
+
+def create_or_update_team_seasons(teams: Dict[str, Team], league_season: LeagueSeason) -> None:
+    """Crée ou met à jour les relations TeamSeason"""
+    for team in teams.values():
+        team_season, created = TeamSeason.objects.update_or_create(
+            team=team,
+            league_season=league_season,
+            defaults={}
+        )
+        
+        if created:
+            logger.debug(f"Nouvelle relation Team-Season créée : {team_season}")
+
+
+def _reject(reasons: pd.Series, mask: pd.Series, reason: str) -> None:
+    """Associe une raison de rejet aux lignes du masque qui n'en ont pas encore"""
+    mask = mask.fillna(False).astype(bool) & reasons.isna()
+    reasons[mask] = reason
+
+
+def validate_matches(matches_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Valide et convertit toutes les lignes de match en une passe vectorisée
+    
+    Returns:
+        Les lignes valides avec des colonnes typées (Date, Wk, scores, xG, Time),
+        et les lignes rejetées telles que lues, avec leur numéro de ligne CSV et
+        la raison du rejet
+    """
+    df = matches_df.copy()
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    
+    # Champs obligatoires
+    for col in REQUIRED_MATCH_COLUMNS:
+        if col not in df.columns:
+            _reject(reasons, pd.Series(True, index=df.index), f"colonne {col} absente")
+            df[col] = None
+    _reject(reasons, df['Home'].isna(), "équipe à domicile manquante")
+    _reject(reasons, df['Away'].isna(), "équipe à l'extérieur manquante")
+    
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    _reject(reasons, df['Date'].isna(), "date manquante ou invalide")
+    
+    wk = pd.to_numeric(df['Wk'], errors='coerce')
+    _reject(reasons, wk.isna() | (wk % 1 != 0), "journée (Wk) manquante ou invalide")
+    df['Wk'] = wk.where(reasons.isna()).astype('Int64')
+    
+    _reject(reasons, df['Home'] == df['Away'], "équipe contre elle-même")
+    
+    # Scores : entiers positifs ; xG : nombres
+    for col in ['Score_Home', 'Score_Away']:
+        if col in df.columns:
+            score = pd.to_numeric(df[col], errors='coerce')
+            _reject(reasons, df[col].notna() & score.isna(), f"{col} non numérique")
+            _reject(reasons, score.notna() & ((score < 0) | (score % 1 != 0)), f"{col} invalide")
+            df[col] = score.where(reasons.isna()).astype('Int64')
+    for col in ['xG_Home', 'xG_Away']:
+        if col in df.columns:
+            xg = pd.to_numeric(df[col], errors='coerce')
+            _reject(reasons, df[col].notna() & xg.isna(), f"{col} non numérique")
+            df[col] = xg.astype('float64')
+    
+    # Heure au format HH:MM (les secondes éventuelles sont ignorées)
+    if 'Time' in df.columns:
+        parsed = pd.to_datetime(df['Time'].astype(str).str.strip().str[:5], format='%H:%M', errors='coerce')
+        _reject(reasons, df['Time'].notna() & parsed.isna(), "heure invalide")
+        df['Time'] = parsed.dt.time.astype(object).where(parsed.notna(), None)
+    
+    rejected_mask = reasons.notna()
+    rejected_df = matches_df.loc[rejected_mask].copy()
+    rejected_df.insert(0, 'Ligne', rejected_df.index + 2)  # en-tête = ligne 1
+    rejected_df['Raison'] = reasons[rejected_mask]
+    
+    if len(rejected_df):
+        summary = ", ".join(f"{reason}: {count}" for reason, count in rejected_df['Raison'].value_counts().items())
+        logger.warning(f"{len(rejected_df)} lignes rejetées ({summary})")
+    
+    return df.loc[~rejected_mask], rejected_df
+
+
+def write_rejects_report(rejected_df: pd.DataFrame, csv_name: str, append: bool = False) -> Optional[Path]:
+    """Écrit les lignes rejetées et leur raison dans data/rejected/<fichier>.rejected.csv"""
+    report_path = REJECTS_DIR / f"{Path(csv_name).stem}.rejected.csv"
+    if rejected_df.empty:
+        # Un rapport d'une exécution précédente ne doit pas survivre à un import propre
+        if not append and report_path.exists():
+            report_path.unlink()
+        return None
+    
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not (append and report_path.exists())
+    rejected_df.to_csv(report_path, mode='a' if append else 'w', header=write_header, index=False)
+    logger.warning(f"Rapport des lignes rejetées : {report_path}")
+    return report_path
+
+
+def _nullable_values(matches_df: pd.DataFrame, column: str) -> list:
+    """Valeurs Python d'une colonne, None pour les valeurs manquantes ou la colonne absente"""
+    if column not in matches_df.columns:
+        return [None] * len(matches_df)
+    values = matches_df[column]
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def prepare_match_rows(matches_df: pd.DataFrame, teams: Dict[str, Team]) -> List[dict]:
+    """Convertit les lignes validées par validate_matches en champs du modèle Match"""
+    team_home = matches_df['Home'].map(teams)
+    team_away = matches_df['Away'].map(teams)
+    known = (team_home.notna() & team_away.notna()).astype(bool)
+    if not known.all():
+        logger.warning(f"{int((~known).sum())} lignes ignorées: équipe inconnue")
+    matches_df = matches_df.loc[known]
+    
+    columns = {
+        'day_number': matches_df['Wk'].astype(int).tolist(),
+        'match_date': matches_df['Date'].dt.date.tolist(),
+        'team_home': team_home.loc[known].tolist(),
+        'team_away': team_away.loc[known].tolist(),
+        'time': _nullable_values(matches_df, 'Time'),
+        'score_home': _nullable_values(matches_df, 'Score_Home'),
+        'score_away': _nullable_values(matches_df, 'Score_Away'),
+        'xG_home': _nullable_values(matches_df, 'xG_Home'),
+        'xG_away': _nullable_values(matches_df, 'xG_Away'),
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def import_matches(matches_df: pd.DataFrame, teams: Dict[str, Team], 
+                  league_season: LeagueSeason,
+                  day_dates: Optional[Dict[int, date]] = None) -> Tuple[int, int]:
+    """
+    Importe les données de matchs dans la base de données
+    
+    day_dates (numéro de journée -> date du premier match) vient de toute la
+    saison quand matches_df n'en est qu'une partie (lignes modifiées).
+    """
+    matches_created = 0
+    matches_updated = 0
+    
+    # Toutes les journées sont écrites en une fois, avant les matchs
+    if day_dates is None:
+        day_dates = derive_match_days(matches_df)
+    match_days = sync_match_days_bulk(day_dates, league_season)
+    
+    for match_row in prepare_match_rows(matches_df, teams):
+        team_home = match_row['team_home']
+        team_away = match_row['team_away']
+        match_day = match_days[match_row['day_number']]
+        
+        # Préparer les données du match
+        match_data = {
+            'day': match_day,
+            'match_date': match_row['match_date'],
+            'team_home': team_home,
+            'team_away': team_away
+        }
+        
+        # Ajouter les champs optionnels s'ils existent
+        for field in ['time', 'score_home', 'score_away', 'xG_home', 'xG_away']:
+            if match_row[field] is not None:
+                match_data[field] = match_row[field]
+        
+        # Créer ou mettre à jour le match dans la base de données
+        _, created = Match.objects.update_or_create(
+            match_date=match_row['match_date'],
+            team_home=team_home,
+            team_away=team_away,
+            defaults=match_data
+        )
+        
+        if created:
+            logger.info(f"Nouveau match créé : {team_home} vs {team_away} ({match_row['match_date']})")
+            matches_created += 1
+        else:
+            logger.debug(f"Match existant mis à jour : {team_home} vs {team_away} ({match_row['match_date']})")
+            matches_updated += 1
+    
+    return matches_created, matches_updated
+
+
+def derive_match_days(matches_df: pd.DataFrame) -> Dict[int, date]:
+    """
+    Déduit les journées en une passe groupée : numéro -> date du premier match
+    
+    La date d'une journée ne dépend donc plus de l'ordre des lignes du CSV.
+    """
+    days = matches_df.dropna(subset=['Wk', 'Date']).groupby('Wk')['Date'].agg(['min', 'size'])
+    if not days.empty:
+        logger.info(f"{len(days)} journées déduites de {int(days['size'].sum())} matchs "
+                    f"({int(days['size'].min())} à {int(days['size'].max())} matchs par journée)")
+    return {int(day_number): first_date.date() for day_number, first_date in days['min'].items()}
+
+
+def sync_match_days_bulk(day_dates: Dict[int, date], league_season: LeagueSeason) -> Dict[int, MatchDay]:
+    """Crée ou met à jour les journées par lots et retourne le mapping numéro -> MatchDay"""
+    existing = {md.day_number: md for md in MatchDay.objects.filter(league_season=league_season)}
+    
+    to_create = []
+    to_update = []
+    for day_number, day_date in day_dates.items():
+        match_day = existing.get(day_number)
+        if match_day is None:
+            to_create.append(MatchDay(day_number=day_number, day_date=day_date, league_season=league_season))
+        elif match_day.day_date != day_date:
+            match_day.day_date = day_date
+            to_update.append(match_day)
+    
+    if to_create:
+        MatchDay.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        # Relire pour récupérer les clés primaires quel que soit le backend
+        existing = {md.day_number: md for md in MatchDay.objects.filter(league_season=league_season)}
+    if to_update:
+        MatchDay.objects.bulk_update(to_update, ['day_date'], batch_size=BULK_BATCH_SIZE)
+    if to_create or to_update:
+        bump_data_version()
+    
+    logger.info(f"Journées : {len(to_create)} créées, {len(to_update)} mises à jour")
+    return existing
+
+
+def import_matches_bulk(matches_df: pd.DataFrame, teams: Dict[str, Team],
+                        league_season: LeagueSeason,
+                        day_dates: Optional[Dict[int, date]] = None) -> Tuple[int, int]:
+    """
+    Importe les matchs par lots : une lecture groupée puis des écritures groupées
+    
+    day_dates (numéro de journée -> date du premier match) est mis à jour avec
+    les journées de matches_df ; le passer d'un appel à l'autre garde la date la
+    plus ancienne quand une journée est répartie sur plusieurs morceaux.
+    """
+    match_rows = prepare_match_rows(matches_df, teams)
+    if not match_rows:
+        return 0, 0
+    
+    day_dates = {} if day_dates is None else day_dates
+    for day_number, first_date in derive_match_days(matches_df).items():
+        day_dates[day_number] = min(first_date, day_dates.get(day_number, first_date))
+    
+    with transaction.atomic():
+        match_days = sync_match_days_bulk(day_dates, league_season)
+        
+        # Une seule requête pour tous les matchs existants de la plage de dates
+        match_dates = [match_row['match_date'] for match_row in match_rows]
+        team_ids = {team.pk for team in teams.values()}
+        existing = {
+            (match.match_date, match.team_home_id, match.team_away_id): match
+            for match in Match.objects.select_related('day').filter(
+                match_date__range=(min(match_dates), max(match_dates)),
+                team_home_id__in=team_ids,
+            )
+        }
+        
+        to_create = {}
+        to_update = {}
+        standings_before = {}  # apport au classement des matchs existants avant réécriture
+        matches_updated = 0
+        for match_row in match_rows:
+            team_home = match_row['team_home']
+            team_away = match_row['team_away']
+            key = (match_row['match_date'], team_home.pk, team_away.pk)
+            fields = {field: match_row[field] for field in MATCH_UPDATE_FIELDS if field != 'day'}
+            fields['day'] = match_days[match_row['day_number']]
+            
+            match = existing.get(key)
+            if match is None:
+                if key not in to_create:
+                    logger.info(f"Nouveau match créé : {team_home} vs {team_away} ({match_row['match_date']})")
+                to_create[key] = Match(match_date=match_row['match_date'], team_home=team_home,
+                                       team_away=team_away, **fields)
+                continue
+            
+            # Les valeurs absentes du CSV ne remplacent pas celles déjà en base
+            if key not in standings_before:
+                standings_before[key] = match_contribution(match)
+            changed = False
+            for field, value in fields.items():
+                if value is None:
+                    continue
+                current = match.day_id if field == 'day' else getattr(match, field)
+                new_value = value.pk if field == 'day' else value
+                if current != new_value:
+                    setattr(match, field, value)
+                    changed = True
+            if changed:
+                to_update[key] = match
+            logger.debug(f"Match existant mis à jour : {team_home} vs {team_away} ({match_row['match_date']})")
+            matches_updated += 1
+        
+        if to_create:
+            Match.objects.bulk_create(list(to_create.values()), batch_size=BULK_BATCH_SIZE)
+        if to_update:
+            Match.objects.bulk_update(list(to_update.values()), MATCH_UPDATE_FIELDS, batch_size=BULK_BATCH_SIZE)
+        
+        # bulk_create / bulk_update n'envoient pas de signaux : le classement
+        # matérialisé reçoit ici le delta cumulé de tout le lot
+        standings_delta = {}
+        for match in to_create.values():
+            add_contribution(standings_delta, match_contribution(match))
+        for key, match in to_update.items():
+            add_contribution(standings_delta, standings_before[key], sign=-1)
+            add_contribution(standings_delta, match_contribution(match))
+        apply_standings_delta(standings_delta)
+        
+        # bulk_* n'envoient pas de signaux : invalider ici les statistiques en cache
+        # et réindexer les matchs écrits pour la recherche plein texte
+        if to_create or to_update:
+            bump_data_version()
+            written = list(to_create.values()) + list(to_update.values())
+            if all(match.pk for match in written):
+                reindex_on_commit('match', [match.pk for match in written])
+            else:
+                reindex_on_commit('league_season', [league_season.pk])
+    
+    logger.info(f"Matchs : {len(to_create)} insérés, {len(to_update)} réécrits, "
+                f"{matches_updated - len(to_update)} inchangés")
+    return len(to_create), matches_updated
+
+
+def compute_row_keys(matches_df: pd.DataFrame) -> pd.Series:
+    """Calcule la clé naturelle (date|domicile|extérieur) de chaque ligne de match"""
+    dates = matches_df['Date'].dt.strftime('%Y-%m-%d').fillna('')
+    return dates + '|' + matches_df['Home'].astype(str) + '|' + matches_df['Away'].astype(str)
+
+
+def compute_row_hashes(matches_df: pd.DataFrame) -> pd.Series:
+    """Calcule l'empreinte SHA-1 du contenu normalisé de chaque ligne de match"""
+    columns = [col for col in HASHED_COLUMNS if col in matches_df.columns]
+    # map(str) rend les NaN sous la forme 'nan', indépendamment de la version de pandas
+    contents = matches_df[columns].apply(lambda col: col.map(str)).agg('|'.join, axis=1)
+    return contents.map(lambda content: hashlib.sha1(content.encode('utf-8')).hexdigest())
+
+
+def get_manifest_path(league_name: str, season_name: str, csv_name: str) -> Path:
+    """Retourne le chemin du manifeste d'import pour un triplet (ligue, saison, fichier)"""
+    stem = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{league_name}__{season_name}__{Path(csv_name).stem}")
+    return MANIFEST_DIR / f"{stem}.json"
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, str]:
+    """Charge les empreintes des lignes déjà importées (vide si aucun manifeste)"""
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            return json.load(file).get("rows", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Manifeste illisible {manifest_path}, import complet : {e}")
+        return {}
+
+
+def get_stored_match_keys(league_season: LeagueSeason, teams: Dict[str, Team]) -> set:
+    """Clés naturelles (date|domicile|extérieur) des matchs de la ligue-saison présents en base"""
+    team_names = {team.pk: team_name for team_name, team in teams.items()}
+    rows = Match.objects.filter(day__league_season=league_season).values_list(
+        'match_date', 'team_home_id', 'team_away_id')
+    return {f"{match_date:%Y-%m-%d}|{team_names.get(home_id)}|{team_names.get(away_id)}"
+            for match_date, home_id, away_id in rows}
+
+
+def save_manifest(manifest_path: Path, prepared: dict) -> None:
+    """Enregistre les empreintes de toutes les lignes du fichier après un import réussi"""
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "league": prepared["league_name"],
+        "season": prepared["season_name"],
+        "file": prepared["csv_name"],
+        "rows": dict(zip(prepared["row_keys"], prepared["row_hashes"])),
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=0)
+
+
+def prepare_csv_file(csv_path: Path) -> dict:
+    """Charge et normalise un fichier CSV sans toucher à la base (exécutable dans un processus séparé)"""
+    raw_df = load_match_data(csv_path)
+    matches_df, rejected_df = validate_matches(raw_df)
+    write_rejects_report(rejected_df, csv_path.name)
+    if matches_df.empty:
+        # Rien à importer : échouer avant toute écriture (ligue, saison, équipes)
+        raise ValueError(f"{csv_path.name} : aucune ligne valide ({len(rejected_df)} lignes rejetées)")
+    league_name, country = extract_league_and_country(csv_path.name)
+    season_name, start_date, end_date = get_season_info(matches_df)
+    return {
+        "csv_name": csv_path.name,
+        "matches_df": matches_df,
+        "rows_read": len(raw_df),
+        "rows_rejected": len(rejected_df),
+        "row_keys": compute_row_keys(matches_df),
+        "row_hashes": compute_row_hashes(matches_df),
+        "league_name": league_name,
+        "country": country,
+        "season_name": season_name,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+
+
+def import_prepared_file(prepared: dict, bulk: bool = False, force: bool = False,
+                         profiler: Optional[ImportProfiler] = None) -> Dict[str, int]:
+    """
+    Écrit en base un fichier préparé par prepare_csv_file et retourne ses statistiques
+    
+    Seules les lignes absentes du manifeste, dont l'empreinte a changé ou dont le
+    match n'est plus en base sont importées, sauf avec force=True qui réécrit
+    toutes les lignes.
+    """
+    profiler = profiler or ImportProfiler()
+    matches_df = prepared["matches_df"]
+    manifest_path = get_manifest_path(prepared["league_name"], prepared["season_name"], prepared["csv_name"])
+    
+    # Créer ou mettre à jour les objets en base de données
+    with profiler.stage("ligue_saison"):
+        league = create_or_update_league(prepared["league_name"], prepared["country"])
+        season = create_or_update_season(prepared["season_name"], prepared["start_date"], prepared["end_date"])
+        league_season = create_or_update_league_season(league, season)
+    
+    # Créer ou mettre à jour les équipes (logos compris)
+    with profiler.stage("equipes"):
+        teams, team_results = create_or_update_teams(matches_df, league)
+    
+    # Créer ou mettre à jour les relations TeamSeason
+    with profiler.stage("equipes_saisons"):
+        create_or_update_team_seasons(teams, league_season)
+    
+    with profiler.stage("manifeste"):
+        known_hashes = {} if force else load_manifest(manifest_path)
+        if known_hashes:
+            # Le manifeste ne vaut que pour les matchs encore en base (base recréée, matchs supprimés)
+            stored_keys = get_stored_match_keys(league_season, teams)
+            missing = sum(1 for key in known_hashes if key not in stored_keys)
+            if missing:
+                logger.warning(f"{missing} lignes du manifeste absentes de la base, réimportées")
+                known_hashes = {key: row_hash for key, row_hash in known_hashes.items() if key in stored_keys}
+        changed_mask = [known_hashes.get(key) != row_hash
+                        for key, row_hash in zip(prepared["row_keys"], prepared["row_hashes"])]
+        delta_df = matches_df[changed_mask]
+    logger.info(f"{len(delta_df)} lignes nouvelles ou modifiées, "
+                f"{len(matches_df) - len(delta_df)} inchangées ignorées")
+    
+    # Importer les matchs (par lots si demandé) ; les dates des journées viennent
+    # de tout le fichier, pas des seules lignes modifiées
+    import_function = import_matches_bulk if bulk else import_matches
+    with profiler.stage("matchs"):
+        matches_created, matches_updated = import_function(
+            delta_df, teams, league_season, derive_match_days(matches_df))
+    
+    # Le manifeste n'est mis à jour qu'une fois les matchs écrits
+    with profiler.stage("manifeste"):
+        save_manifest(manifest_path, prepared)
+    
+    return {
+        "teams_created": sum(1 for _, created in team_results if created),
+        "teams_updated": sum(1 for _, created in team_results if not created),
+        "matches_created": matches_created,
+        "matches_updated": matches_updated,
+        "matches_skipped": len(matches_df) - len(delta_df),
+        "rows_rejected": prepared["rows_rejected"],
+        "total_processed": prepared["rows_read"]
+    }
+
+
+def get_league_season_names(csv_path: Path, chunksize: int, default_league_name: str) -> Dict[str, str]:
+    """
+    Nom de saison de chaque ligue du fichier, avec la règle de get_season_info
+    (année du premier match - année du dernier match)
+
+    Passe préalable sur les seules colonnes League et Date : l'import en continu
+    nomme les saisons comme l'import classique, reprise comprise.
+    """
+    spans: Dict[str, List[pd.Timestamp]] = {}
+    for chunk in iter_match_chunks(csv_path, chunksize, columns=['League', 'Date']):
+        dates = pd.to_datetime(chunk['Date'], errors='coerce')
+        league_names = chunk['League'].fillna(default_league_name) if 'League' in chunk else \
+            pd.Series(default_league_name, index=chunk.index)
+        for league_name, (first, last) in dates.groupby(league_names).agg(['min', 'max']).iterrows():
+            if pd.isna(first):
+                continue
+            span = spans.setdefault(league_name, [first, last])
+            span[0], span[1] = min(span[0], first), max(span[1], last)
+    return {league_name: f"{first.year}-{last.year}" for league_name, (first, last) in spans.items()}
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus en Mo (None si non mesurable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS et en kilo-octets sous Linux
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def import_csv_streaming(csv_path: Path, chunksize: int = STREAM_CHUNKSIZE,
+                         profiler: Optional[ImportProfiler] = None, start_row: int = 0,
+                         on_chunk_committed: Optional[Callable[[int], None]] = None) -> Dict[str, float]:
+    """
+    Importe un CSV volumineux par morceaux de taille fixe, à mémoire constante
+    
+    Les ligues, saisons et équipes déjà vues sont gardées dans des dictionnaires
+    d'un morceau à l'autre ; chaque morceau est écrit par lots dans sa propre
+    transaction. Les colonnes League / Country / Season, si présentes, permettent
+    d'importer un export consolidé ; sinon la ligue vient du nom de fichier et
+    la saison des dates de ses matchs dans tout le fichier (get_league_season_names).
+    
+    start_row permet de reprendre un import interrompu après les lignes déjà
+    validées ; on_chunk_committed reçoit, après chaque transaction validée, le
+    nombre total de lignes du fichier désormais en base.
+    """
+    default_league_name, default_country = extract_league_and_country(csv_path.name)
+    league_season_names = get_league_season_names(csv_path, chunksize, default_league_name)
+    
+    leagues: Dict[str, League] = {}
+    seasons: Dict[str, Season] = {}
+    season_bounds: Dict[str, List[date]] = {}
+    league_seasons: Dict[Tuple[str, str], LeagueSeason] = {}
+    teams: Dict[str, Team] = {}
+    team_seasons = set()
+    match_day_dates: Dict[int, Dict[int, date]] = {}  # league_season.pk -> journée -> premier match
+    
+    profiler = profiler or ImportProfiler()
+    stats = {"teams_created": 0, "matches_created": 0, "matches_updated": 0,
+             "rows_rejected": 0, "total_processed": 0}
+    started = time.perf_counter()
+    
+    reader = iter_match_chunks(csv_path, chunksize, start_row)
+    chunk_number = 0
+    while True:
+        with profiler.stage("lecture_csv"):
+            chunk = next(reader, None)
+        if chunk is None:
+            break
+        chunk_number += 1
+        stats["total_processed"] += len(chunk)
+        with profiler.stage("validation"):
+            chunk, rejected_chunk = validate_matches(chunk)
+            write_rejects_report(rejected_chunk, csv_path.name, append=chunk_number > 1 or start_row > 0)
+        stats["rows_rejected"] += len(rejected_chunk)
+        
+        # Ligue et saison de chaque ligne, colonne par colonne
+        league_names = chunk['League'].fillna(default_league_name) if 'League' in chunk else \
+            pd.Series(default_league_name, index=chunk.index)
+        season_names = chunk['Season'] if 'Season' in chunk else \
+            pd.Series(pd.NA, index=chunk.index, dtype='string')
+        season_names = season_names.fillna(league_names.map(league_season_names))
+        
+        with transaction.atomic():
+            for (league_name, season_name), group_df in chunk.groupby([league_names, season_names], sort=False):
+                with profiler.stage("ligue_saison"):
+                    if league_name not in leagues:
+                        country = None
+                        if 'Country' in group_df and group_df['Country'].notna().any():
+                            country = group_df['Country'].dropna().iloc[0]
+                        elif league_name == default_league_name:
+                            country = default_country
+                        leagues[league_name] = create_or_update_league(league_name, country)
+                    league = leagues[league_name]
+                    
+                    # Les bornes de la saison s'élargissent au fil des morceaux
+                    start_date, end_date = group_df['Date'].min().date(), group_df['Date'].max().date()
+                    bounds = season_bounds.setdefault(season_name, [start_date, end_date])
+                    bounds[0], bounds[1] = min(bounds[0], start_date), max(bounds[1], end_date)
+                    if season_name not in seasons:
+                        if start_row:
+                            # Reprise : les lignes déjà importées comptent dans les bornes
+                            existing = Season.objects.filter(season_name=season_name).first()
+                            if existing:
+                                bounds[0] = min(bounds[0], existing.start_date)
+                                bounds[1] = max(bounds[1], existing.end_date)
+                        seasons[season_name] = create_or_update_season(season_name, *bounds)
+                    
+                    key = (league_name, season_name)
+                    if key not in league_seasons:
+                        league_seasons[key] = create_or_update_league_season(league, seasons[season_name])
+                        if start_row:
+                            # Reprise : les journées déjà écrites gardent leur premier match
+                            match_day_dates[league_seasons[key].pk] = dict(
+                                MatchDay.objects.filter(league_season=league_seasons[key])
+                                .values_list('day_number', 'day_date'))
+                    league_season = league_seasons[key]
+                
+                # Seules les équipes jamais vues pendant cet import touchent la base
+                names = set(group_df['Home'].dropna()) | set(group_df['Away'].dropna())
+                with profiler.stage("equipes"):
+                    for team_name in sorted(names - teams.keys()):
+                        teams[team_name], created = create_or_update_team(team_name, league)
+                        stats["teams_created"] += int(created)
+                
+                with profiler.stage("equipes_saisons"):
+                    new_team_seasons = [
+                        TeamSeason(team=teams[team_name], league_season=league_season)
+                        for team_name in names if (teams[team_name].pk, league_season.pk) not in team_seasons
+                    ]
+                    TeamSeason.objects.bulk_create(new_team_seasons, ignore_conflicts=True)
+                    team_seasons.update((ts.team.pk, league_season.pk) for ts in new_team_seasons)
+                
+                with profiler.stage("matchs"):
+                    matches_created, matches_updated = import_matches_bulk(
+                        group_df, teams, league_season, match_day_dates.setdefault(league_season.pk, {}))
+                stats["matches_created"] += matches_created
+                stats["matches_updated"] += matches_updated
+        
+        if on_chunk_committed:
+            on_chunk_committed(start_row + stats["total_processed"])
+        elapsed = time.perf_counter() - started
+        logger.info(f"Morceau {chunk_number} écrit : {stats['total_processed']} lignes "
+                    f"({stats['total_processed'] / elapsed:.0f} lignes/s)")
+    
+    # Dates définitives des saisons une fois tout le fichier parcouru
+    for season_name, (start_date, end_date) in season_bounds.items():
+        season = seasons[season_name]
+        if (season.start_date, season.end_date) != (start_date, end_date):
+            season.start_date, season.end_date = start_date, end_date
+            season.save(update_fields=['start_date', 'end_date'])
+    
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["rows_per_second"] = round(stats["total_processed"] / elapsed, 1) if elapsed else 0.0
+    stats["peak_rss_mb"] = get_peak_rss_mb()
+    return stats
+
+
+def discover_csv_files(csv_dir: Path) -> List[Path]:
+    """
+    Liste tous les fichiers CSV ligue-saison d'un répertoire (sous-dossiers inclus)
+    
+    Les exports Parquet sans CSV sont aussi retenus, sous le nom du CSV
+    équivalent : load_match_data lit alors le Parquet.
+    """
+    csv_files = set(csv_dir.rglob('*.csv'))
+    if pq is not None:
+        csv_files.update(path.with_suffix('.csv') for path in csv_dir.rglob('*.parquet'))
+        if csv_dir.resolve() == CSV_DIR.resolve() and PARQUET_DIR.exists():
+            csv_files.update(csv_dir / f"{path.stem}.csv" for path in PARQUET_DIR.glob('*.parquet'))
+    return sorted(csv_files)
+
+
+def log_directory_report(summaries: Dict[str, Dict[str, int]], failures: Dict[str, str]) -> None:
+    """Affiche le résumé par fichier et la liste des échecs d'un import de répertoire"""
+    logger.info(f"Résumé de l'import ({len(summaries)} réussis, {len(failures)} en échec) :")
+    for csv_name, stats in sorted(summaries.items()):
+        logger.info(
+            f"  [OK]     {csv_name}: {stats['matches_created']} matchs créés, "
+            f"{stats['matches_updated']} mis à jour, {stats['matches_skipped']} inchangés, "
+            f"{stats['rows_rejected']} rejetés, "
+            f"{stats['teams_created']} équipes créées "
+            f"({stats['total_processed']} lignes)"
+        )
+    for csv_name, error in sorted(failures.items()):
+        logger.error(f"  [ÉCHEC]  {csv_name}: {error}")
+
+
+def import_directory(csv_dir: Path, bulk: bool = False, workers: Optional[int] = None,
+                     force: bool = False, profiler: Optional[ImportProfiler] = None) -> int:
+    """
+    Importe tous les CSV d'un répertoire
+    
+    La lecture et la normalisation pandas sont réparties dans un pool de processus ;
+    les écritures passent par le processus principal, un fichier à la fois,
+    car SQLite n'accepte qu'un seul écrivain.
+    """
+    if not csv_dir.exists():
+        logger.error(f"Le répertoire {csv_dir} n'existe pas.")
+        return 1
+    
+    csv_files = discover_csv_files(csv_dir)
+    if not csv_files:
+        logger.warning(f"Aucun fichier CSV trouvé dans {csv_dir}")
+        return 0
+    logger.info(f"{len(csv_files)} fichiers CSV trouvés dans {csv_dir}")
+    
+    profiler = profiler or ImportProfiler()
+    summaries = {}
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(prepare_csv_file, csv_path): csv_path for csv_path in csv_files}
+        for future in as_completed(futures):
+            csv_name = futures[future].name
+            try:
+                # Avec --profile, mesure l'attente des processus de lecture
+                with profiler.stage("lecture_csv"):
+                    prepared = future.result()
+            except Exception as e:
+                logger.error(f"Lecture impossible de {csv_name} : {e}")
+                failures[csv_name] = f"lecture : {type(e).__name__}: {e}"
+                continue
+            
+            try:
+                summaries[csv_name] = import_prepared_file(prepared, bulk=bulk, force=force, profiler=profiler)
+                logger.success(f"{csv_name} importé : {summaries[csv_name]}")
+            except Exception as e:
+                logger.exception(f"Import impossible de {csv_name} : {e}")
+                failures[csv_name] = f"écriture : {type(e).__name__}: {e}"
+    
+    log_directory_report(summaries, failures)
+    return 1 if failures else 0
@@ -0,0 +1,230 @@
+"""Index des logos présents dans static/logos.
+
+L'index associe un nom normalisé à un chemin relatif à static/logos, par type
+d'entité ('teams', 'leagues', 'countries') et par pays / ligue. Il est construit
+une seule fois par processus, mis en cache sur disque et invalidé dès que la
+date de modification d'un des dossiers de logos change.
+
+Utilisation :
+    index = get_logo_index()
+    index.find('Arsenal', 'teams', country='England', league_name='Premier League')
+
+Le même module résout les URLs des logos (resolve_logo_url) pour les
+serializers et le tag {% logo_url %} : MEDIA d'abord, puis les fichiers
+statiques. Les URLs résolues sont gardées en mémoire : la table est chauffée
+au premier rendu d'un logo, puis plus aucun accès disque.
+"""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+CACHE_PATH = Path(settings.BASE_DIR) / 'data' / 'cache' / 'logo_index.json'
+LOGO_EXTENSIONS = ('.png',)
+
+_index = None
+# Nom de fichier (FieldFile.name) -> URL résolue, et fichiers présents dans MEDIA_ROOT
+_logo_urls: Dict[str, str] = {}
+_media_files = None
+
+
+def get_logos_root() -> Path:
+    """Retourne le dossier racine des logos (static/logos)"""
+    static_dirs = getattr(settings, 'STATICFILES_DIRS', [])
+    static_root = static_dirs[0] if static_dirs else os.path.join(settings.BASE_DIR, 'static')
+    return Path(static_root) / 'logos'
+
+
+def normalize_logo_name(name: str) -> str:
+    """Normalise un nom d'entité ou de fichier : minuscules, lettres et chiffres uniquement"""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def _directory_signature(logos_root: Path) -> Dict[str, int]:
+    """Date de modification de chaque dossier : change dès qu'un fichier y est ajouté ou supprimé"""
+    signature = {}
+    for dirpath, _, _ in os.walk(logos_root):
+        signature[os.path.relpath(dirpath, logos_root)] = os.stat(dirpath).st_mtime_ns
+    return signature
+
+
+def _scan_logo_paths(logos_root: Path) -> List[str]:
+    """Liste les fichiers de logos, en chemins relatifs avec des '/'"""
+    paths = []
+    for dirpath, _, filenames in os.walk(logos_root):
+        for filename in filenames:
+            if filename.lower().endswith(LOGO_EXTENSIONS):
+                rel_path = os.path.relpath(os.path.join(dirpath, filename), logos_root)
+                paths.append(rel_path.replace(os.path.sep, '/'))
+    return sorted(paths)
+
+
+class LogoIndex:
+    """Tables de correspondance en mémoire entre noms normalisés et chemins de logos"""
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        self._paths = set(paths)
+        # (type, pays, ligue) -> {nom normalisé: chemin} ; pays / ligue à None pour les niveaux supérieurs
+        self._by_scope: Dict[Tuple[str, Optional[str], Optional[str]], Dict[str, str]] = {}
+        # type -> {nom normalisé: chemin}, tous sous-dossiers confondus
+        self._by_type: Dict[str, Dict[str, str]] = {}
+
+        for rel_path in paths:
+            parts = rel_path.split('/')
+            entity_type = parts[0]
+            country = parts[1] if len(parts) > 2 else None
+            league_name = parts[2] if len(parts) > 3 else None
+            key = normalize_logo_name(Path(parts[-1]).stem)
+            self._by_scope.setdefault((entity_type, country, league_name), {}).setdefault(key, rel_path)
+            self._by_type.setdefault(entity_type, {}).setdefault(key, rel_path)
+
+    def exists(self, rel_path: str) -> bool:
+        """Indique si un chemin relatif à static/logos correspond à un logo indexé"""
+        return rel_path.replace(os.path.sep, '/') in self._paths
+
+    def find(self, entity_name: str, entity_type: str, country: str = None,
+             league_name: str = None) -> Optional[str]:
+        """
+        Trouve le chemin du logo d'une entité
+
+        Les correspondances exactes (dossier de la ligue, puis tout le type
+        d'entité) sont des accès directs ; la correspondance partielle ne
+        parcourt que les noms en mémoire, sans accès disque.
+        """
+        key = normalize_logo_name(entity_name)
+        if not key:
+            return None
+
+        scoped = self._by_scope.get((entity_type, country, league_name), {}) if country and league_name else {}
+        if key in scoped:
+            return scoped[key]
+        by_type = self._by_type.get(entity_type, {})
+        if key in by_type:
+            return by_type[key]
+
+        # Correspondance partielle, d'abord dans le dossier de la ligue puis partout
+        for name, rel_path in scoped.items():
+            if key in name or name in key:
+                return rel_path
+        if len(key) > 3:
+            for name, rel_path in by_type.items():
+                if key in name:
+                    return rel_path
+        return None
+
+
+def _load_cached_paths(signature: Dict[str, int]) -> Optional[List[str]]:
+    """Relit l'index sur disque s'il correspond encore aux dossiers de logos"""
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if cached.get('signature') != signature:
+        return None
+    return cached.get('paths')
+
+
+def _save_cached_paths(signature: Dict[str, int], paths: List[str]) -> None:
+    """Écrit l'index sur disque ; un échec n'empêche pas d'utiliser l'index en mémoire"""
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as file:
+            json.dump({'signature': signature, 'paths': paths}, file, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def get_logo_index(refresh: bool = False) -> LogoIndex:
+    """Retourne l'index des logos, construit au premier appel puis conservé pour le processus"""
+    global _index
+    if _index is not None and not refresh:
+        return _index
+
+    logos_root = get_logos_root()
+    if not logos_root.exists():
+        _index = LogoIndex([])
+        return _index
+
+    signature = _directory_signature(logos_root)
+    paths = None if refresh else _load_cached_paths(signature)
+    if paths is None:
+        paths = _scan_logo_paths(logos_root)
+        _save_cached_paths(signature, paths)
+    _index = LogoIndex(paths)
+    invalidate_logo_urls()
+    return _index
+
+
+def invalidate_logo_index() -> None:
+    """Oublie l'index en mémoire, à appeler après avoir ajouté, déplacé ou supprimé des logos"""
+    global _index
+    _index = None
+    invalidate_logo_urls()
+
+
+# Résolution des URLs de logos
+
+def _scan_media_files() -> set:
+    """Fichiers présents dans MEDIA_ROOT, en chemins relatifs avec des '/' (un seul parcours)"""
+    media_root = getattr(settings, 'MEDIA_ROOT', None)
+    files = set()
+    if not media_root or not os.path.isdir(media_root):
+        return files
+    for dirpath, _, filenames in os.walk(media_root):
+        for filename in filenames:
+            rel_path = os.path.relpath(os.path.join(dirpath, filename), media_root)
+            files.add(rel_path.replace(os.path.sep, '/'))
+    return files
+
+
+def _resolve(name: str) -> str:
+    """URL d'un fichier : MEDIA s'il y est présent, sinon les fichiers statiques"""
+    global _media_files
+    if _media_files is None:
+        _media_files = _scan_media_files()
+    if name.replace(os.path.sep, '/') in _media_files:
+        return settings.MEDIA_URL + name.replace(os.path.sep, '/')
+    try:
+        return staticfiles_storage.url(name)
+    except Exception:
+        # En dernier recours, chemin statique construit à partir du nom
+        return static(name)
+
+
+def resolve_logo_url(name: str, request=None) -> str:
+    """
+    URL d'un logo à partir du nom stocké (ImageField.name), mise en cache par nom
+
+    Avec une requête, l'URL est rendue absolue.
+    """
+    if not _logo_urls:
+        # Premier appel du processus (ou après invalidation) : table chauffée en une fois
+        warm_logo_urls()
+    url = _logo_urls.get(name)
+    if url is None:
+        url = _logo_urls[name] = _resolve(name)
+    if request:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def warm_logo_urls() -> int:
+    """Pré-résout les URLs de tous les logos indexés (avec et sans préfixe 'logos/')"""
+    for rel_path in get_logo_index().paths:
+        for name in (rel_path, f'logos/{rel_path}'):
+            _logo_urls.setdefault(name, _resolve(name))
+    return len(_logo_urls)
+
+
+def invalidate_logo_urls() -> None:
+    """Oublie les URLs résolues, à appeler quand des fichiers de logos ou de MEDIA changent"""
+    global _media_files
+    _logo_urls.clear()
+    _media_files = None
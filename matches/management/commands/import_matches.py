@@ -0,0 +1,121 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from matches.importer import (
+    CSV_DIR, STREAM_CHUNKSIZE, discover_csv_files, find_columnar_file, import_csv_streaming,
+)
+
+DEFAULT_CHECKPOINT = Path(settings.BASE_DIR) / 'data' / 'checkpoints' / 'import_matches.json'
+
+
+def file_sha1(path: Path) -> str:
+    """SHA-1 of the file actually read (Parquet export if present, else the CSV)."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: Path) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path: Path, checkpoint: dict) -> None:
+    """Write the checkpoint atomically so a crash never leaves a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(checkpoint, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+class Command(BaseCommand):
+    help = ('Import match CSV files in chunked transactions, recording a checkpoint after each '
+            'committed chunk so an interrupted run resumes where it stopped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='CSV files to import (paths or names in data/raw/csv).')
+        parser.add_argument('--all', action='store_true', help='Import every CSV file found in --csv-dir.')
+        parser.add_argument('--csv-dir', default=str(CSV_DIR), help='Directory scanned by --all.')
+        parser.add_argument('--chunksize', type=int, default=STREAM_CHUNKSIZE,
+                            help='Rows per chunk, each chunk is committed in its own transaction.')
+        parser.add_argument('--checkpoint', default=str(DEFAULT_CHECKPOINT), help='Checkpoint file path.')
+        parser.add_argument('--restart', action='store_true', help='Ignore any existing checkpoint.')
+
+    def resolve_files(self, options):
+        if options['all']:
+            return discover_csv_files(Path(options['csv_dir']))
+        if not options['files']:
+            raise CommandError('Give at least one CSV file, or use --all.')
+        paths = []
+        for name in options['files']:
+            path = Path(name)
+            if not path.exists() and (CSV_DIR / name).exists():
+                path = CSV_DIR / name
+            if not path.exists() and not find_columnar_file(path):
+                raise CommandError(f'File not found: {name}')
+            paths.append(path)
+        return paths
+
+    def handle(self, *args, **options):
+        checkpoint_path = Path(options['checkpoint'])
+        checkpoint = {} if options['restart'] else load_checkpoint(checkpoint_path)
+        files = checkpoint.setdefault('files', {})
+        finished = []
+
+        for csv_path in self.resolve_files(options):
+            key = str(csv_path.resolve())
+            source = find_columnar_file(csv_path) or csv_path
+            source_hash = file_sha1(source)
+            entry = files.get(key)
+            if entry and entry.get('hash') != source_hash:
+                self.stdout.write(f'{csv_path.name}: file changed since the checkpoint, importing from the start')
+                entry = None
+            if entry and entry.get('done'):
+                self.stdout.write(f'{csv_path.name}: already imported, skipped')
+                finished.append(key)
+                continue
+
+            start_row = entry['offset'] if entry else 0
+            if start_row:
+                self.stdout.write(f'{csv_path.name}: resuming after row {start_row}')
+            entry = files[key] = {'file': str(source), 'offset': start_row, 'hash': source_hash, 'done': False}
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            def on_chunk_committed(offset, entry=entry):
+                entry['offset'] = offset
+                save_checkpoint(checkpoint_path, checkpoint)
+
+            try:
+                stats = import_csv_streaming(csv_path, options['chunksize'], start_row=start_row,
+                                             on_chunk_committed=on_chunk_committed)
+            except Exception as exc:
+                raise CommandError(
+                    f'{csv_path.name} failed after row {entry["offset"]}: {exc}. '
+                    f'Checkpoint kept in {checkpoint_path}, re-run the same command to resume.'
+                ) from exc
+
+            entry['done'] = True
+            save_checkpoint(checkpoint_path, checkpoint)
+            finished.append(key)
+            self.stdout.write(self.style.SUCCESS(
+                f'{csv_path.name}: {stats["matches_created"]} created, {stats["matches_updated"]} updated, '
+                f'{stats["rows_rejected"]} rejected ({stats["total_processed"]} rows read)'
+            ))
+
+        # Forget only the files of this run: entries of other runs (other files) stay resumable
+        for key in finished:
+            files.pop(key, None)
+        if files:
+            save_checkpoint(checkpoint_path, checkpoint)
+        elif checkpoint_path.exists():
+            checkpoint_path.unlink()
@@ -3,6 +3,7 @@ from django.conf import settings
 import os
 import shutil
 
+from matches.logo_index import invalidate_logo_index
 from matches.models import League, Team
 
 
@@ -59,6 +60,7 @@ class Command(BaseCommand):
                     changed += 1
                 return
 
+            # Check the disk directly: the logo index only lists .png files
             if os.path.exists(static_desired_path):
                 self.stdout.write(f"Would set {obj} logo.name -> {desired} (exists in STATIC)")
                 if apply_changes:
@@ -74,6 +76,8 @@ class Command(BaseCommand):
                     dest_dir = os.path.dirname(static_desired_path)
                     os.makedirs(dest_dir, exist_ok=True)
                     shutil.move(static_old_path, static_desired_path)
+                    # The file moved: the logo index is rebuilt on next use
+                    invalidate_logo_index()
                     obj.logo.name = desired
                     obj.save(update_fields=['logo'])
                     changed += 1
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from matches.search import create_search_index, rebuild_search_index, search_index_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the SQLite FTS5 full-text index used by match search.'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The full-text index is only used with SQLite; search falls back to icontains.')
+        if not search_index_available():
+            create_search_index()
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} matches'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from matches.models import LeagueSeason
+from matches.standings import rebuild_team_standings, verify_team_standings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized TeamStanding table from Match rows, then verify it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--league-season', type=int, help='Only rebuild this LeagueSeason id.')
+        parser.add_argument('--verify-only', action='store_true',
+                            help='Compare the table with a fresh aggregation without rewriting it.')
+
+    def handle(self, *args, **options):
+        league_season = None
+        if options['league_season']:
+            try:
+                league_season = LeagueSeason.objects.get(pk=options['league_season'])
+            except LeagueSeason.DoesNotExist:
+                raise CommandError(f"LeagueSeason {options['league_season']} does not exist")
+
+        if not options['verify_only']:
+            count = rebuild_team_standings(league_season)
+            self.stdout.write(f'Rebuilt {count} standing rows')
+
+        errors = verify_team_standings(league_season)
+        for error in errors[:50]:
+            self.stdout.write(self.style.WARNING(error))
+        if errors:
+            raise CommandError(f'{len(errors)} mismatches between TeamStanding and Match rows')
+        self.stdout.write(self.style.SUCCESS('Standings verified: table matches Match rows'))
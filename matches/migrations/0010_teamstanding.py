@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Remplissage initial depuis les matchs joués, en SQL figé à l'état de cette migration
+# (même calcul que matches.standings.rebuild_team_standings : victoire 3 points, nul 1)
+BACKFILL_SQL = """
+    INSERT INTO matches_teamstanding (team_id, league_season_id, played, wins, draws, losses,
+                                      goals_for, goals_against, "xG_for", "xG_against", points)
+    SELECT s.team_id, s.league_season_id, COUNT(*),
+           SUM(CASE WHEN s.gf > s.ga THEN 1 ELSE 0 END),
+           SUM(CASE WHEN s.gf = s.ga THEN 1 ELSE 0 END),
+           SUM(CASE WHEN s.gf < s.ga THEN 1 ELSE 0 END),
+           SUM(s.gf), SUM(s.ga), SUM(s.xgf), SUM(s.xga),
+           SUM(CASE WHEN s.gf > s.ga THEN 3 WHEN s.gf = s.ga THEN 1 ELSE 0 END)
+    FROM (
+        SELECT m.team_home_id AS team_id, md.league_season_id, m.score_home AS gf, m.score_away AS ga,
+               COALESCE(m."xG_home", 0) AS xgf, COALESCE(m."xG_away", 0) AS xga
+        FROM matches_match m JOIN matches_matchday md ON md.id = m.day_id
+        WHERE m.score_home IS NOT NULL AND m.score_away IS NOT NULL AND md.league_season_id IS NOT NULL
+        UNION ALL
+        SELECT m.team_away_id, md.league_season_id, m.score_away, m.score_home,
+               COALESCE(m."xG_away", 0), COALESCE(m."xG_home", 0)
+        FROM matches_match m JOIN matches_matchday md ON md.id = m.day_id
+        WHERE m.score_home IS NOT NULL AND m.score_away IS NOT NULL AND md.league_season_id IS NOT NULL
+    ) s
+    GROUP BY s.team_id, s.league_season_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0009_alter_league_options_alter_season_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('draws', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('goals_for', models.PositiveIntegerField(default=0)),
+                ('goals_against', models.PositiveIntegerField(default=0)),
+                ('xG_for', models.FloatField(default=0)),
+                ('xG_against', models.FloatField(default=0)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('league_season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='matches.leagueseason')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='matches.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['league_season', '-points'], name='standing_table_idx')],
+                'unique_together': {('team', 'league_season')},
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
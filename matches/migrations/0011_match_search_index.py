@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# SQL figé à l'état de cette migration : matches/search.py peut évoluer sans la modifier
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS matches_match_fts USING fts5("
+    "teams, aliases, league, season, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS matches_match_fts_trigram USING fts5("
+    "teams, aliases, league, season, tokenize='trigram')",
+]
+DOCUMENTS_SQL = """
+    SELECT m.id,
+           th.team_name || ' ' || ta.team_name,
+           COALESCE(th.short_name, '') || ' ' || COALESCE(ta.short_name, ''),
+           COALESCE(l.league_name, '') || ' ' || COALESCE(l.country, ''),
+           COALESCE(s.season_name, '')
+    FROM matches_match m
+    JOIN matches_team th ON th.id = m.team_home_id
+    JOIN matches_team ta ON ta.id = m.team_away_id
+    JOIN matches_matchday md ON md.id = m.day_id
+    LEFT JOIN matches_leagueseason ls ON ls.id = md.league_season_id
+    LEFT JOIN matches_league l ON l.id = ls.league_id
+    LEFT JOIN matches_season s ON s.id = ls.season_id
+"""
+DROP_SQL = [
+    "DROP TABLE IF EXISTS matches_match_fts",
+    "DROP TABLE IF EXISTS matches_match_fts_trigram",
+]
+
+
+def forwards(apps, schema_editor):
+    # Index plein texte SQLite uniquement ; ailleurs la recherche revient à icontains
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+    for table in ('matches_match_fts', 'matches_match_fts_trigram'):
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, teams, aliases, league, season) {DOCUMENTS_SQL}"
+        )
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0010_teamstanding"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
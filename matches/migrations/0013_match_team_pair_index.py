@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:05
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0012_match_date_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(django.db.models.functions.comparison.Least('team_home', 'team_away'), django.db.models.functions.comparison.Greatest('team_home', 'team_away'), models.F('match_date'), name='match_team_pair_idx'),
+        ),
+    ]
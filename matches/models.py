@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Greatest, Least
 from django.forms import ValidationError
 from .constants import TEAM_SHORT_NAME_MAPPING, LEAGUE_COUNTRY_MAPPING
 
@@ -123,9 +124,41 @@ class Match(models.Model):
         ordering = ["match_date", "day"]
         # Une équipe ne peut pas jouer deux fois le même jour
         unique_together = ['match_date', 'team_home', 'team_away']
+        # Pagination par curseur sur (match_date, id)
+        indexes = [
+            models.Index(fields=['match_date', 'id'], name='match_date_id_idx'),
+            # Paire d'équipes non orientée (face-à-face), sans OR sur domicile / extérieur
+            models.Index(Least('team_home', 'team_away'), Greatest('team_home', 'team_away'), 'match_date',
+                         name='match_team_pair_idx'),
+        ]
 
     def __str__(self):
         score = ""
         if self.score_home is not None and self.score_away is not None:
             score = f" ({self.score_home}-{self.score_away})"
-        return f"{self.match_date} - {self.team_home} vs {self.team_away}{score}"
\ No newline at end of file
+        return f"{self.match_date} - {self.team_home} vs {self.team_away}{score}"
+
+class TeamStanding(models.Model):
+    # Classement matérialisé par équipe et ligue-saison, tenu à jour à chaque écriture de match
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='standings')
+    league_season = models.ForeignKey(LeagueSeason, on_delete=models.CASCADE, related_name='standings')
+    played = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    goals_for = models.PositiveIntegerField(default=0)
+    goals_against = models.PositiveIntegerField(default=0)
+    xG_for = models.FloatField(default=0)
+    xG_against = models.FloatField(default=0)
+    points = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['team', 'league_season']
+        indexes = [models.Index(fields=['league_season', '-points'], name='standing_table_idx')]
+
+    @property
+    def goal_difference(self):
+        return self.goals_for - self.goals_against
+
+    def __str__(self):
+        return f"{self.team} - {self.league_season} ({self.points} pts)"
@@ -0,0 +1,149 @@
+"""Pagination par curseur (keyset) sur (match_date, id), du plus récent au plus ancien.
+
+Chaque page filtre sur la position du dernier match vu au lieu de compter puis
+de sauter OFFSET lignes : la page N coûte le même prix que la première, grâce
+à l'index (match_date, id). Le total n'est pas calculé, sauf sur demande
+(count=approx) : il est alors mis en cache par paramètres et version des données.
+"""
+import base64
+from datetime import date
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .caching import get_or_compute
+
+CURSOR_PARAM = 'cursor'
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(direction: str, match) -> str:
+    """Curseur opaque : sens ('n' suivant, 'p' précédent) et position (date, id) d'un match"""
+    raw = f"{direction}|{match.match_date.isoformat()}|{match.pk}"
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, date, int]:
+    """Décode un curseur ; lève ValueError s'il est invalide"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        direction, match_date, pk = raw.split('|')
+        if direction not in ('n', 'p'):
+            raise ValueError(direction)
+        return direction, date.fromisoformat(match_date), int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('invalid cursor') from exc
+
+
+def keyset_page(queryset, cursor: Optional[str], page_size: int) -> Tuple[List, Optional[str], Optional[str]]:
+    """
+    Une page de matchs après (ou avant) le curseur, du plus récent au plus ancien
+
+    Returns:
+        (matchs de la page, curseur de la page suivante, curseur de la page précédente)
+    """
+    direction, match_date, pk = decode_cursor(cursor) if cursor else ('n', None, None)
+    if direction == 'n':
+        queryset = queryset.order_by('-match_date', '-id')
+        if match_date is not None:
+            queryset = queryset.filter(Q(match_date__lt=match_date) | Q(match_date=match_date, id__lt=pk))
+    else:
+        queryset = queryset.order_by('match_date', 'id').filter(
+            Q(match_date__gt=match_date) | Q(match_date=match_date, id__gt=pk)
+        )
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'p':
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    # Plus de lignes au-delà dans le sens de lecture ; dans l'autre sens, il y en a
+    # forcément dès qu'on est parti d'un curseur
+    has_next = has_more if direction == 'n' else True
+    has_previous = cursor is not None if direction == 'n' else has_more
+    next_cursor = encode_cursor('n', rows[-1]) if has_next else None
+    previous_cursor = encode_cursor('p', rows[0]) if has_previous else None
+    return rows, next_cursor, previous_cursor
+
+
+def approximate_count(queryset, params: dict) -> int:
+    """Nombre de résultats mis en cache par paramètres et version des données (un COUNT par jeu de filtres)"""
+    return get_or_compute('match_count', params, queryset.count)
+
+
+def wants_cursor_pagination(request) -> bool:
+    """Le mode curseur est choisi par pagination=cursor ou par la présence d'un curseur"""
+    params = getattr(request, 'query_params', request.GET)
+    return params.get('pagination') == 'cursor' or CURSOR_PARAM in params
+
+
+class MatchKeysetPagination(BasePagination):
+    """
+    Pagination DRF par curseur sur (match_date, id) ; count=approx ajoute un total en cache
+
+    L'ordre est fixe (du plus récent au plus ancien) : ordering est refusé (400).
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            return max(1, min(int(request.query_params[self.page_size_query_param]), MAX_PAGE_SIZE))
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        if 'ordering' in request.query_params:
+            raise ValidationError({'ordering': 'Cursor pagination uses a fixed order (match_date, id), '
+                                               'ordering is not supported.'})
+        try:
+            rows, self.next_cursor, self.previous_cursor = keyset_page(
+                queryset, request.query_params.get(CURSOR_PARAM), self.get_page_size(request)
+            )
+        except ValueError:
+            raise NotFound('Invalid cursor')
+
+        self.count = None
+        if request.query_params.get('count') == 'approx':
+            params = {key: value for key, value in request.query_params.items()
+                      if key not in (CURSOR_PARAM, 'page_size', 'format')}
+            self.count = approximate_count(queryset, params)
+        return rows
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(remove_query_param(self.base_url, 'page'), CURSOR_PARAM, cursor)
+
+    def get_paginated_response(self, data):
+        payload = {'next': self._link(self.next_cursor), 'previous': self._link(self.previous_cursor)}
+        if self.count is not None:
+            payload['approximate_count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+
+class MatchPagination(PageNumberPagination):
+    """Pagination par numéro de page (par défaut), ou par curseur avec pagination=cursor"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if wants_cursor_pagination(request):
+            self._keyset = MatchKeysetPagination()
+            return self._keyset.paginate_queryset(queryset, request, view)
+        self._keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self._keyset is not None:
+            return self._keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,175 @@
+"""Index plein texte des matchs (SQLite FTS5).
+
+Une ligne par match (rowid = id du match) avec les noms des deux équipes, leurs
+noms courts, la ligue (et son pays) et la saison. Deux tables virtuelles :
+
+- matches_match_fts : tokens unicode sans accents, recherche par préfixe
+  ("manch unit" trouve Manchester United) ;
+- matches_match_fts_trigram : trigrammes, recherche approximative sur des
+  fragments de mots ("chest" trouve Manchester).
+
+L'index est tenu à jour par les signaux (matchs, équipes, ligues, saisons) et
+par l'import en masse ; `manage.py rebuild_search_index` le reconstruit. Sur
+un autre moteur que SQLite, search_matches_queryset() revient à icontains.
+"""
+import re
+
+from django.db import connection as default_connection, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'matches_match_fts'
+TRIGRAM_TABLE = 'matches_match_fts_trigram'
+FTS_COLUMNS = 'teams, aliases, league, season'
+
+# Documents indexés, construits dans la base à partir des tables du modèle
+_DOCUMENTS_FROM = """
+    FROM matches_match m
+    JOIN matches_team th ON th.id = m.team_home_id
+    JOIN matches_team ta ON ta.id = m.team_away_id
+    JOIN matches_matchday md ON md.id = m.day_id
+    LEFT JOIN matches_leagueseason ls ON ls.id = md.league_season_id
+    LEFT JOIN matches_league l ON l.id = ls.league_id
+    LEFT JOIN matches_season s ON s.id = ls.season_id
+"""
+_DOCUMENTS_SQL = """
+    SELECT m.id,
+           th.team_name || ' ' || ta.team_name,
+           COALESCE(th.short_name, '') || ' ' || COALESCE(ta.short_name, ''),
+           COALESCE(l.league_name, '') || ' ' || COALESCE(l.country, ''),
+           COALESCE(s.season_name, '')
+""" + _DOCUMENTS_FROM
+
+# Filtres de réindexation : les matchs touchés par l'écriture d'une entité
+_SCOPES = {
+    'match': 'm.id IN ({ids})',
+    'match_day': 'm.day_id IN ({ids})',
+    'team': 'm.team_home_id IN ({ids}) OR m.team_away_id IN ({ids})',
+    'league_season': 'md.league_season_id IN ({ids})',
+    'league': 'ls.league_id IN ({ids})',
+    'season': 'ls.season_id IN ({ids})',
+}
+
+REINDEX_BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_available = set()  # Bases où l'index a déjà été trouvé (évite une introspection par requête)
+
+
+def create_search_index(connection=None) -> None:
+    """Crée les tables FTS5 et les remplit (sans effet hors SQLite)"""
+    connection = connection or default_connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{FTS_COLUMNS}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TRIGRAM_TABLE} USING fts5("
+            f"{FTS_COLUMNS}, tokenize='trigram')"
+        )
+    rebuild_search_index(connection)
+
+
+def drop_search_index(connection=None) -> None:
+    connection = connection or default_connection
+    _available.discard(connection.alias)
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        cursor.execute(f"DROP TABLE IF EXISTS {TRIGRAM_TABLE}")
+
+
+def search_index_available(connection=None) -> bool:
+    """Indique si l'index FTS5 existe sur cette base"""
+    connection = connection or default_connection
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _available and FTS_TABLE in connection.introspection.table_names():
+        _available.add(connection.alias)
+    return connection.alias in _available
+
+
+def rebuild_search_index(connection=None) -> int:
+    """Reconstruit entièrement l'index depuis les matchs ; retourne le nombre de matchs indexés"""
+    connection = connection or default_connection
+    if connection.vendor != 'sqlite':
+        return 0
+    with connection.cursor() as cursor:
+        for table in (FTS_TABLE, TRIGRAM_TABLE):
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"INSERT INTO {table} (rowid, {FTS_COLUMNS}) {_DOCUMENTS_SQL}")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def reindex(scope: str, ids) -> None:
+    """
+    Réindexe les matchs liés aux entités écrites
+
+    scope vaut 'match', 'match_day', 'team', 'league_season', 'league' ou
+    'season'. Les documents sont recalculés dans la base par un INSERT ... SELECT,
+    par lots d'identifiants.
+    """
+    ids = sorted({int(pk) for pk in ids if pk is not None})
+    if not ids or not search_index_available():
+        return
+    with default_connection.cursor() as cursor:
+        for start in range(0, len(ids), REINDEX_BATCH_SIZE):
+            batch = ids[start:start + REINDEX_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            where = _SCOPES[scope].format(ids=placeholders)
+            params = batch * where.count('IN (')
+            for table in (FTS_TABLE, TRIGRAM_TABLE):
+                if scope == 'match':
+                    # Un match supprimé sort simplement de l'index
+                    cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({placeholders})", batch)
+                else:
+                    cursor.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT m.id {_DOCUMENTS_FROM} WHERE {where})", params)
+                cursor.execute(f"INSERT INTO {table} (rowid, {FTS_COLUMNS}) {_DOCUMENTS_SQL} WHERE {where}", params)
+
+
+def reindex_on_commit(scope: str, ids) -> None:
+    """Réindexe une fois la transaction en cours validée"""
+    ids = list(ids)
+    transaction.on_commit(lambda: reindex(scope, ids))
+
+
+def build_fts_query(query: str, fuzzy: bool = False) -> str:
+    """
+    Traduit une saisie libre en requête FTS5 : chaque mot est requis
+
+    Sans fuzzy, chaque mot est cherché par préfixe ("mancheste"*). Avec fuzzy,
+    les mots d'au moins trois lettres sont cherchés comme fragments dans
+    l'index trigramme.
+    """
+    tokens = _TOKEN_RE.findall(query.lower())
+    if fuzzy:
+        tokens = [token for token in tokens if len(token) >= 3]
+        return ' AND '.join(f'"{token}"' for token in tokens)
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def search_matches_queryset(queryset, query: str, fuzzy: bool = False):
+    """Filtre un queryset de matchs sur une saisie libre, via l'index FTS5 si disponible"""
+    query = query.strip()
+    if not query:
+        return queryset
+    if search_index_available(connections[queryset.db]):
+        fts_query = build_fts_query(query, fuzzy)
+        if not fts_query:
+            return queryset.none()
+        table = TRIGRAM_TABLE if fuzzy else FTS_TABLE
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [fts_query])
+        )
+    # Repli sans index plein texte
+    return queryset.filter(
+        Q(team_home__team_name__icontains=query) |
+        Q(team_away__team_name__icontains=query) |
+        Q(day__league_season__league__league_name__icontains=query)
+    )
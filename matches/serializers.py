@@ -1,37 +1,66 @@
 from rest_framework import serializers
-from django.conf import settings
-from django.templatetags.static import static
-from django.contrib.staticfiles.storage import staticfiles_storage
-import os
 
+from .logo_index import resolve_logo_url
 from .models import Team, League, MatchDay, Match
 
 
 def _build_file_url(name, request=None):
     """Return absolute URL for a file name trying media then static.
 
-    `name` is the stored file name (ImageField.name). The function checks
-    MEDIA_ROOT for the file first and returns MEDIA_URL+name if present.
-    Otherwise it falls back to the static files URL.
+    `name` is the stored file name (ImageField.name). Resolution goes through
+    the shared logo URL cache (MEDIA_URL+name if the file is in MEDIA_ROOT,
+    else the static files URL), so no filesystem access happens per object.
     """
-    # try media
-    media_path = os.path.join(settings.MEDIA_ROOT, name)
-    if os.path.exists(media_path):
-        url = settings.MEDIA_URL + name.replace(os.path.sep, '/')
-    else:
-        # try staticfiles (this will raise if not found, so wrap)
-        try:
-            url = staticfiles_storage.url(name)
-        except Exception:
-            # as a last resort, try building a static path under 'logos/'
-            url = static(name)
-
-    if request:
-        return request.build_absolute_uri(url)
-    return url
-
-
-class LeagueSerializer(serializers.ModelSerializer):
+    return resolve_logo_url(name, request=request)
+
+
+def parse_field_options(params) -> dict:
+    """Read ?fields=, ?expand= and ?flat=1 from the query params.
+
+    `fields` keeps only the listed top-level fields; with `flat`, related teams
+    and leagues are rendered as ids (side-loaded by the view) except the
+    relations listed in `expand`, which stay nested.
+    """
+    def names(key):
+        return {name.strip() for name in params.get(key, '').split(',') if name.strip()}
+
+    return {
+        'fields': names('fields'),
+        'expand': names('expand'),
+        'flat': params.get('flat', '') in ('1', 'true'),
+    }
+
+
+class DynamicFieldsMixin:
+    """Applies the `field_options` of the serializer context to the top-level serializer.
+
+    `flat_fields` maps a relation name to a factory for its flat replacement field.
+    """
+    flat_fields = {}
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        options = self.context.get('field_options')
+        if not options or not self._is_top_level():
+            return fields
+        if options['flat']:
+            for name, make_field in self.flat_fields.items():
+                if name in fields and name not in options['expand']:
+                    fields[name] = make_field()
+        if options['fields']:
+            fields = {name: field for name, field in fields.items() if name in options['fields']}
+        return fields
+
+
+def _pk_field():
+    return serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class LeagueSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     logo_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -45,10 +74,12 @@ class LeagueSerializer(serializers.ModelSerializer):
         return _build_file_url(obj.logo.name, request=request)
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     league = LeagueSerializer(read_only=True)
     logo_url = serializers.SerializerMethodField()
 
+    flat_fields = {'league': _pk_field}
+
     class Meta:
         model = Team
         fields = ('id', 'team_name', 'short_name', 'logo_url', 'league')
@@ -72,10 +103,27 @@ class MatchDaySerializer(serializers.ModelSerializer):
         return obj.league_season.league.league_name if obj.league_season and obj.league_season.league else None
 
 
-class MatchSerializer(serializers.ModelSerializer):
+class FlatMatchDaySerializer(serializers.ModelSerializer):
+    """Match day with the league as an id, for flat mode."""
+    season = serializers.CharField(source='league_season.season.season_name', default=None, read_only=True)
+    league = serializers.IntegerField(source='league_season.league_id', default=None, read_only=True)
+
+    class Meta:
+        model = MatchDay
+        fields = ['day_number', 'day_date', 'season', 'league']
+
+
+class MatchSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     team_home = TeamSerializer(read_only=True)
     team_away = TeamSerializer(read_only=True)
     day = MatchDaySerializer(read_only=True)
+
+    flat_fields = {
+        'team_home': _pk_field,
+        'team_away': _pk_field,
+        'day': lambda: FlatMatchDaySerializer(read_only=True),
+    }
+
     class Meta:
         model = Match
         fields = [
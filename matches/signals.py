@@ -0,0 +1,122 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_data_version
+from .logo_index import invalidate_logo_urls
+from .search import reindex_on_commit
+from .models import League, LeagueSeason, Match, MatchDay, Season, Team
+from .standings import add_contribution, apply_standings_delta, match_contribution
+
+
+def _stored_contribution(match_pk):
+    """Apport au classement du match tel qu'il est actuellement en base"""
+    stored = Match.objects.filter(pk=match_pk).values(
+        'team_home_id', 'team_away_id', 'score_home', 'score_away', 'xG_home', 'xG_away',
+        league_season_id=F('day__league_season_id'),
+    ).first()
+    return match_contribution(stored) if stored else {}
+
+
+@receiver(pre_save, sender=Match)
+def remember_standing_before_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._standing_before = _stored_contribution(instance.pk) if instance.pk else {}
+
+
+@receiver(post_save, sender=Match)
+def update_standings_after_save(sender, instance, raw=False, **kwargs):
+    """Applique au classement matérialisé la seule différence avant / après l'écriture"""
+    if raw:
+        return
+    delta = {}
+    add_contribution(delta, getattr(instance, '_standing_before', {}), sign=-1)
+    add_contribution(delta, match_contribution(instance))
+    apply_standings_delta(delta)
+
+
+@receiver(pre_delete, sender=Match)
+def remember_standing_before_delete(sender, instance, **kwargs):
+    instance._standing_before = _stored_contribution(instance.pk)
+
+
+@receiver(post_delete, sender=Match)
+def update_standings_after_delete(sender, instance, **kwargs):
+    delta = {}
+    add_contribution(delta, getattr(instance, '_standing_before', {}), sign=-1)
+    # Les lignes supprimées en cascade (équipe, ligue-saison) ne sont pas recréées
+    apply_standings_delta(delta, create_missing=False)
+
+
+# Modèles affichés : leurs écritures invalident le cache et réindexent les matchs concernés
+_SEARCH_SCOPES = {Match: 'match', MatchDay: 'match_day', Team: 'team', League: 'league',
+                  Season: 'season', LeagueSeason: 'league_season'}
+# Champs qui entrent dans les documents indexés (équipes, alias, ligue, pays, saison)
+_INDEXED_FIELDS = {
+    Match: {'team_home_id', 'team_away_id', 'day_id'},
+    MatchDay: {'league_season_id'},
+    Team: {'team_name', 'short_name'},
+    League: {'league_name', 'country'},
+    Season: {'season_name'},
+    LeagueSeason: {'league_id', 'season_id'},
+}
+
+
+def _changed_fields(instance, update_fields=None):
+    """Champs (attname) dont la valeur diffère de la base ; None pour une ligne pas encore en base"""
+    fields = [field for field in instance._meta.concrete_fields if not field.primary_key]
+    if update_fields is not None:
+        fields = [field for field in fields if field.name in update_fields or field.attname in update_fields]
+    attnames = [field.attname for field in fields]
+    stored = type(instance)._default_manager.filter(pk=instance.pk).values(*attnames).first() if instance.pk else None
+    if stored is None:
+        return None
+    return {attname for attname in attnames if getattr(instance, attname) != stored[attname]}
+
+
+@receiver(pre_save)
+def remember_changed_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Relit la ligne en base : les saves sans effet ne bumpent pas la version ni ne réindexent"""
+    if not raw and sender in _SEARCH_SCOPES:
+        instance._changed_fields = _changed_fields(instance, update_fields)
+
+
+@receiver(post_save)
+def bump_version_on_save(sender, instance, created=False, **kwargs):
+    """Une écriture qui modifie les données affichées invalide les réponses en cache"""
+    if sender not in _SEARCH_SCOPES:
+        return
+    # Sans relecture préalable (chargement raw), on invalide par prudence
+    changed = getattr(instance, '_changed_fields', None)
+    if created or changed is None or changed:
+        bump_data_version()
+
+
+@receiver(post_delete)
+def bump_version_on_delete(sender, **kwargs):
+    if sender in _SEARCH_SCOPES:
+        bump_data_version()
+
+
+@receiver(post_save)
+def reindex_search_on_save(sender, instance, created=False, raw=False, **kwargs):
+    """Réindexe à la création ou si un champ indexé a changé : un update_or_create sans effet ne coûte rien"""
+    if raw or sender not in _SEARCH_SCOPES:
+        return
+    changed = getattr(instance, '_changed_fields', None)
+    if created or changed is None or changed & _INDEXED_FIELDS[sender]:
+        reindex_on_commit(_SEARCH_SCOPES[sender], [instance.pk])
+
+
+@receiver(post_delete, sender=Match)
+def reindex_search_on_delete(sender, instance, **kwargs):
+    reindex_on_commit('match', [instance.pk])
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=League)
+def refresh_logo_urls(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Un logo envoyé ou renommé peut changer de MEDIA à statique : on re-résout les URLs"""
+    if not raw and (update_fields is None or 'logo' in update_fields):
+        invalidate_logo_urls()
@@ -0,0 +1,314 @@
+"""Moteur de classement : joués / V / N / D / BP / BC / diff / points en une requête.
+
+Le classement se calcule sur n'importe quel queryset de matchs (filtres des
+vues, d'un FilterSet DRF ou d'un script) :
+
+    standings = compute_standings(filter_matches(league=1, season=2))
+
+Chaque match filtré est déplié en deux lignes (domicile et extérieur) par un
+UNION ALL, puis une seule agrégation conditionnelle groupe par équipe.
+
+Le même calcul, groupé par (équipe, ligue-saison), alimente la table
+matérialisée TeamStanding : les écritures de match n'y appliquent ensuite que
+leur delta (match_contribution / apply_standings_delta) et get_league_table()
+lit un classement en une requête indexée.
+
+Les mêmes lignes dépliées servent aux statistiques over / under par équipe
+(compute_over_under), elles aussi en une seule requête groupée.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connections, transaction
+from django.db.models import F, Q
+
+from .models import Match, Team, TeamStanding
+
+POINTS_WIN = 3
+POINTS_DRAW = 1
+
+# Départage : points, différence de buts, buts marqués, victoires, puis nom
+STANDINGS_ORDER = ('points', 'goal_difference', 'goals_for', 'wins')
+
+
+def filter_matches(queryset=None, league=None, season=None, date_from=None, date_to=None):
+    """Applique les filtres des vues de statistiques et ne garde que les matchs joués"""
+    matches = Match.objects.all() if queryset is None else queryset
+    if league:
+        matches = matches.filter(day__league_season__league__id=league)
+    if season:
+        matches = matches.filter(day__league_season__season__id=season)
+    if date_from:
+        matches = matches.filter(match_date__gte=date_from)
+    if date_to:
+        matches = matches.filter(match_date__lte=date_to)
+    return matches.filter(score_home__isnull=False, score_away__isnull=False)
+
+
+def _unfolded_sql(matches) -> Tuple[str, list]:
+    """
+    SQL dépliant chaque match joué en deux lignes (domicile et extérieur) :
+    team_id, league_season_id, is_home, gf, ga, xgf, xga
+    """
+    # Seules les colonnes utiles, sans tri ni select_related hérités du queryset
+    inner = matches.order_by().values(
+        s_home=F('team_home_id'), s_away=F('team_away_id'), s_ls=F('day__league_season_id'),
+        s_sh=F('score_home'), s_sa=F('score_away'), s_xh=F('xG_home'), s_xa=F('xG_away'),
+    )
+    inner_sql, inner_params = inner.query.sql_with_params()
+    sql = f"""
+        SELECT m.s_home AS team_id, m.s_ls AS league_season_id, 1 AS is_home, m.s_sh AS gf, m.s_sa AS ga,
+               COALESCE(m.s_xh, 0) AS xgf, COALESCE(m.s_xa, 0) AS xga FROM ({inner_sql}) m
+        UNION ALL
+        SELECT m.s_away AS team_id, m.s_ls AS league_season_id, 0 AS is_home, m.s_sa AS gf, m.s_sh AS ga,
+               COALESCE(m.s_xa, 0) AS xgf, COALESCE(m.s_xh, 0) AS xga FROM ({inner_sql}) m
+    """
+    return sql, list(inner_params) * 2
+
+
+# Agrégation conditionnelle commune au classement calculé et à sa reconstruction
+_AGGREGATES_SQL = f"""
+    COUNT(*) AS played,
+    SUM(CASE WHEN s.gf > s.ga THEN 1 ELSE 0 END) AS wins,
+    SUM(CASE WHEN s.gf = s.ga THEN 1 ELSE 0 END) AS draws,
+    SUM(CASE WHEN s.gf < s.ga THEN 1 ELSE 0 END) AS losses,
+    SUM(s.gf) AS goals_for,
+    SUM(s.ga) AS goals_against,
+    SUM(s.gf) - SUM(s.ga) AS goal_difference,
+    SUM(s.xgf) AS xg_for,
+    SUM(s.xga) AS xg_against,
+    SUM(CASE WHEN s.gf > s.ga THEN {POINTS_WIN} WHEN s.gf = s.ga THEN {POINTS_DRAW} ELSE 0 END) AS points
+"""
+
+
+def _fetch_dicts(db: str, sql: str, params: list) -> List[dict]:
+    with connections[db].cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def compute_standings(matches=None, limit: Optional[int] = None) -> List[dict]:
+    """
+    Calcule le classement de toutes les équipes des matchs donnés en une requête
+
+    Returns:
+        Une ligne par équipe, triée avec les départages de STANDINGS_ORDER :
+        rank, team_id, team_name, played, wins, draws, losses, goals_for,
+        goals_against, goal_difference, xg_for, xg_against, points
+    """
+    matches = filter_matches(matches)
+    unfolded_sql, params = _unfolded_sql(matches)
+    sql = f"""
+        SELECT t.id AS team_id, t.team_name, {_AGGREGATES_SQL}
+        FROM ({unfolded_sql}) s
+        INNER JOIN {Team._meta.db_table} t ON t.id = s.team_id
+        GROUP BY t.id, t.team_name
+        ORDER BY {', '.join(f'{column} DESC' for column in STANDINGS_ORDER)}, t.team_name ASC
+    """
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+
+    rows = _fetch_dicts(matches.db, sql, params)
+    for row in rows:
+        row['xg_for'], row['xg_against'] = round(row['xg_for'], 2), round(row['xg_against'], 2)
+    return [{'rank': rank, **row} for rank, row in enumerate(rows, start=1)]
+
+
+# Over / under par équipe
+
+OVER_UNDER_SIDES = ('all', 'home', 'away')
+# Condition « over » par métrique, sur une ligne dépliée (buts de l'équipe, encaissés, total du match, les deux marquent)
+OVER_UNDER_METRICS = {
+    'scored': 's.gf > %s',
+    'conceded': 's.ga > %s',
+    'total': 's.gf + s.ga > %s',
+    'btts': 's.gf > 0 AND s.ga > 0',
+}
+
+
+def compute_over_under(matches=None, line: float = 1.5, side: str = 'all', metric: str = 'scored') -> List[dict]:
+    """
+    Pour chaque équipe des matchs donnés, nombre de matchs au-dessus de la ligne, en une requête
+
+    `side` limite aux matchs à domicile ou à l'extérieur de l'équipe ; la ligne
+    est ignorée pour btts.
+
+    Returns:
+        Une ligne par équipe, triée par nom : team_id, team_name, gp, over, under, pct
+    """
+    if side not in OVER_UNDER_SIDES:
+        raise ValueError(f"side must be one of {', '.join(OVER_UNDER_SIDES)}")
+    if metric not in OVER_UNDER_METRICS:
+        raise ValueError(f"metric must be one of {', '.join(OVER_UNDER_METRICS)}")
+
+    matches = filter_matches(matches)
+    unfolded_sql, params = _unfolded_sql(matches)
+    condition = OVER_UNDER_METRICS[metric]
+    condition_params = [line] if '%s' in condition else []
+    where = '' if side == 'all' else f"WHERE s.is_home = {int(side == 'home')}"
+    sql = f"""
+        SELECT t.id AS team_id, t.team_name, COUNT(*) AS gp,
+               SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS over_count
+        FROM ({unfolded_sql}) s
+        INNER JOIN {Team._meta.db_table} t ON t.id = s.team_id
+        {where}
+        GROUP BY t.id, t.team_name
+        ORDER BY t.team_name ASC
+    """
+    rows = _fetch_dicts(matches.db, sql, condition_params + params)
+    return [
+        {
+            'team_id': row['team_id'], 'team_name': row['team_name'], 'gp': row['gp'],
+            'over': row['over_count'], 'under': row['gp'] - row['over_count'],
+            'pct': round(row['over_count'] / row['gp'] * 100, 2) if row['gp'] else 0.0,
+        }
+        for row in rows
+    ]
+
+
+# Classement matérialisé (TeamStanding)
+
+STANDING_FIELDS = ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+                   'xG_for', 'xG_against', 'points')
+
+
+def match_contribution(match) -> Dict[Tuple[int, int], Dict[str, float]]:
+    """
+    Apport d'un match au classement : {(team_id, league_season_id): {champ: valeur}}
+
+    `match` est une instance de Match ou un dict avec team_home_id, team_away_id,
+    league_season_id, score_home, score_away, xG_home et xG_away. Un match sans
+    score ou sans ligue-saison n'apporte rien.
+    """
+    get = match.get if isinstance(match, dict) else lambda field: getattr(match, field, None)
+    league_season_id = get('league_season_id')
+    if league_season_id is None and not isinstance(match, dict):
+        league_season_id = match.day.league_season_id
+    score_home, score_away = get('score_home'), get('score_away')
+    if score_home is None or score_away is None or league_season_id is None:
+        return {}
+
+    contribution = {}
+    for team_id, gf, ga, xgf, xga in (
+        (get('team_home_id'), score_home, score_away, get('xG_home'), get('xG_away')),
+        (get('team_away_id'), score_away, score_home, get('xG_away'), get('xG_home')),
+    ):
+        contribution[(team_id, league_season_id)] = {
+            'played': 1,
+            'wins': int(gf > ga),
+            'draws': int(gf == ga),
+            'losses': int(gf < ga),
+            'goals_for': gf,
+            'goals_against': ga,
+            'xG_for': xgf or 0,
+            'xG_against': xga or 0,
+            'points': POINTS_WIN if gf > ga else POINTS_DRAW if gf == ga else 0,
+        }
+    return contribution
+
+
+def add_contribution(delta: Dict[Tuple[int, int], Dict[str, float]], contribution: dict, sign: int = 1) -> None:
+    """Ajoute (sign=1) ou retire (sign=-1) l'apport d'un match à un delta cumulé"""
+    for key, values in contribution.items():
+        totals = delta.setdefault(key, dict.fromkeys(STANDING_FIELDS, 0))
+        for field, value in values.items():
+            totals[field] += sign * value
+
+
+def apply_standings_delta(delta: Dict[Tuple[int, int], Dict[str, float]], create_missing: bool = True) -> int:
+    """
+    Applique un delta cumulé aux lignes TeamStanding concernées
+
+    Une requête UPDATE ... SET champ = champ + delta par ligne modifiée ; une
+    ligne absente est recalculée depuis les matchs si create_missing (le delta
+    seul peut être négatif ou incomplet). Retourne le nombre de lignes touchées.
+    """
+    touched = 0
+    with transaction.atomic():
+        for (team_id, league_season_id), values in delta.items():
+            changes = {field: value for field, value in values.items() if value}
+            if not changes:
+                continue
+            touched += 1
+            updated = TeamStanding.objects.filter(team_id=team_id, league_season_id=league_season_id).update(
+                **{field: F(field) + value for field, value in changes.items()}
+            )
+            if not updated and create_missing:
+                _rebuild_standing_row(team_id, league_season_id)
+    return touched
+
+
+def aggregate_team_standings(matches=None) -> List[dict]:
+    """Recalcule depuis les matchs les lignes de classement par (équipe, ligue-saison), en une requête"""
+    matches = filter_matches(matches).filter(day__league_season__isnull=False)
+    unfolded_sql, params = _unfolded_sql(matches)
+    sql = f"""
+        SELECT s.team_id, s.league_season_id, {_AGGREGATES_SQL}
+        FROM ({unfolded_sql}) s
+        GROUP BY s.team_id, s.league_season_id
+    """
+    return _fetch_dicts(matches.db, sql, params)
+
+
+def _standing_from_row(row: dict) -> TeamStanding:
+    return TeamStanding(team_id=row['team_id'], league_season_id=row['league_season_id'],
+                        xG_for=row['xg_for'], xG_against=row['xg_against'],
+                        **{field: row[field] for field in STANDING_FIELDS if not field.startswith('xG')})
+
+
+def _rebuild_standing_row(team_id: int, league_season_id: int) -> None:
+    """Recrée depuis les matchs une ligne absente de la table (équipe, ligue-saison)"""
+    matches = Match.objects.filter(Q(team_home_id=team_id) | Q(team_away_id=team_id),
+                                   day__league_season_id=league_season_id)
+    for row in aggregate_team_standings(matches):
+        if row['team_id'] == team_id:
+            _standing_from_row(row).save()
+
+
+def rebuild_team_standings(league_season=None) -> int:
+    """Reconstruit entièrement le classement matérialisé (d'une ligue-saison ou de toutes)"""
+    matches = Match.objects.all()
+    standings = TeamStanding.objects.all()
+    if league_season is not None:
+        matches = matches.filter(day__league_season=league_season)
+        standings = standings.filter(league_season=league_season)
+
+    rows = [_standing_from_row(row) for row in aggregate_team_standings(matches)]
+    with transaction.atomic():
+        standings.delete()
+        TeamStanding.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def verify_team_standings(league_season=None) -> List[str]:
+    """Compare le classement matérialisé au recalcul depuis les matchs ; retourne les écarts"""
+    matches = Match.objects.all()
+    standings = TeamStanding.objects.all()
+    if league_season is not None:
+        matches = matches.filter(day__league_season=league_season)
+        standings = standings.filter(league_season=league_season)
+
+    expected = {(row['team_id'], row['league_season_id']): row for row in aggregate_team_standings(matches)}
+    stored = {(s.team_id, s.league_season_id): s for s in standings}
+    errors = []
+    for key in sorted(expected.keys() | stored.keys()):
+        row, standing = expected.get(key), stored.get(key)
+        if standing is None:
+            errors.append(f"team={key[0]} league_season={key[1]}: ligne manquante")
+            continue
+        for field in STANDING_FIELDS:
+            expected_value = (row[field.lower()] if row else 0)
+            stored_value = getattr(standing, field)
+            if abs(expected_value - stored_value) > 1e-6:
+                errors.append(f"team={key[0]} league_season={key[1]}: {field} = {stored_value}, attendu {expected_value}")
+    return errors
+
+
+def get_league_table(league_season) -> List[TeamStanding]:
+    """Classement d'une ligue-saison lu dans la table matérialisée (une requête indexée)"""
+    return list(
+        TeamStanding.objects.filter(league_season=league_season)
+        .select_related('team')
+        .annotate(goal_difference_value=F('goals_for') - F('goals_against'))
+        .order_by('-points', '-goal_difference_value', '-goals_for', '-wins', 'team__team_name')
+    )
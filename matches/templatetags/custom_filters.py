@@ -1,10 +1,7 @@
 from django import template
 from .constants import TEAM_SHORTCUTS
 from datetime import datetime, timedelta
-from django.conf import settings
-from django.templatetags.static import static
-from django.contrib.staticfiles.storage import staticfiles_storage
-import os
+from matches.logo_index import resolve_logo_url
 
 register = template.Library()
 
@@ -25,20 +22,22 @@ def logo_url(context, logo):
     if not name:
         return ''
 
-    # prefer MEDIA if file exists there
-    media_path = os.path.join(settings.MEDIA_ROOT, name)
-    if os.path.exists(media_path):
-        url = settings.MEDIA_URL + name.replace(os.path.sep, '/')
-    else:
-        try:
-            url = staticfiles_storage.url(name)
-        except Exception:
-            url = static(name)
+    # prefer MEDIA, then static files; resolved once per name (cache shared with the serializers)
+    return resolve_logo_url(name, request=context.get('request'))
+
+@register.simple_tag(takes_context=True)
+def url_replace(context, **params):
+    """Query string de la requête courante avec des paramètres remplacés (None : retiré).
 
-    request = context.get('request')
-    if request:
-        return request.build_absolute_uri(url)
-    return url
+    Usage : <a href="{% url_replace cursor=next_cursor page=None %}">
+    """
+    query = context['request'].GET.copy()
+    for key, value in params.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return '?' + query.urlencode()
 
 @register.filter
 def ajust_team_name(team):
@@ -1,3 +1,559 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+import pandas as pd
+from django.core.management import CommandError, call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from loguru import logger
+
+from . import importer
+from .models import LeagueSeason, Match, MatchDay, Season, Team, TeamStanding
+from .standings import compute_standings, get_league_table, verify_team_standings
+
+# Journées 4 et 5 de Premier League 2024-2025 : la journée 5 s'étale sur deux jours
+CSV_HEADER = "Wk,Date,Time,Home,xG_Home,Score_Home,Score_Away,xG_Away,Away\n"
+CSV_ROWS = [
+    "4,2024-09-14,12:30,Southampton,0.8,0,3,2.0,Manchester United",
+    "4,2024-09-14,15:00,Brighton & Hove Albion,1.4,0,0,0.7,Ipswich Town",
+    "4,2024-09-15,16:30,Tottenham Hotspur,1.3,0,1,1.0,Arsenal",
+    "5,2024-09-21,12:30,West Ham,0.9,0,3,2.2,Chelsea",
+    "5,2024-09-21,15:00,Liverpool,2.0,3,0,1.1,Bournemouth",
+    "5,2024-09-22,14:00,Brighton & Hove Albion,1.0,2,2,1.4,Nottingham Forest",
+    "5,2024-09-22,16:30,Manchester City,2.1,2,2,0.7,Arsenal",
+]
+
+
+# Cache propre aux tests, sans toucher au cache fichier partagé du projet
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'football-history-tests'}})
+class ImportTestCase(TestCase):
+    """Import d'un petit CSV dans un dossier temporaire (manifestes et rejets compris)"""
+    csv_name = "Premier-League-2024-2025.csv"
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        for name, path in (('MANIFEST_DIR', 'manifests'), ('REJECTS_DIR', 'rejected')):
+            patcher = mock.patch.object(importer, name, self.tmp_dir / path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        logger.disable('matches')
+        self.addCleanup(logger.enable, 'matches')
+        self.csv_path = self.tmp_dir / self.csv_name
+        self.write_csv(CSV_ROWS)
+
+    def write_csv(self, rows):
+        self.csv_path.write_text(CSV_HEADER + "\n".join(rows) + "\n", encoding='utf-8')
+
+    def run_import(self, bulk=True, force=False):
+        prepared = importer.prepare_csv_file(self.csv_path)
+        return importer.import_prepared_file(prepared, bulk=bulk, force=force)
+
+
+class MatchDayDateTests(ImportTestCase):
+
+    def test_day_date_is_first_match_of_the_whole_day_after_delta_import(self):
+        for bulk in (True, False):
+            with self.subTest(bulk=bulk):
+                self.write_csv(CSV_ROWS)
+                self.run_import(bulk=bulk, force=True)
+                # Seule la dernière rencontre de la journée 5 (le 22) change
+                self.write_csv(CSV_ROWS[:-1] + [CSV_ROWS[-1].replace(",2,2,", ",3,2,")])
+                stats = self.run_import(bulk=bulk)
+
+                self.assertEqual(stats['matches_updated'], 1)
+                self.assertEqual(MatchDay.objects.get(day_number=5).day_date, date(2024, 9, 21))
+                self.assertEqual(MatchDay.objects.get(day_number=4).day_date, date(2024, 9, 14))
+
+
+class ImportManifestTests(ImportTestCase):
+
+    def test_unchanged_rows_are_skipped(self):
+        first = self.run_import()
+        second = self.run_import()
+
+        self.assertEqual(first['matches_created'], len(CSV_ROWS))
+        self.assertEqual((second['matches_created'], second['matches_updated']), (0, 0))
+        self.assertEqual(second['matches_skipped'], len(CSV_ROWS))
+
+    def test_changed_row_is_reimported(self):
+        self.run_import()
+        self.write_csv([CSV_ROWS[0].replace(",0,3,", ",1,3,")] + CSV_ROWS[1:])
+        stats = self.run_import()
+
+        self.assertEqual((stats['matches_updated'], stats['matches_skipped']), (1, len(CSV_ROWS) - 1))
+        self.assertEqual(Match.objects.get(team_home__team_name='Southampton').score_home, 1)
+
+    def test_force_rewrites_every_row(self):
+        self.run_import()
+        stats = self.run_import(force=True)
+
+        self.assertEqual((stats['matches_updated'], stats['matches_skipped']), (len(CSV_ROWS), 0))
+
+    def test_manifest_is_ignored_for_matches_missing_from_the_database(self):
+        self.run_import()
+        # Base recréée (ou matchs supprimés) : le manifeste sur disque ne doit rien sauter
+        Match.objects.all().delete()
+        stats = self.run_import()
+
+        self.assertEqual(stats['matches_created'], len(CSV_ROWS))
+        self.assertEqual(Match.objects.count(), len(CSV_ROWS))
+
+
+class ValidateMatchesTests(ImportTestCase):
+
+    # Ligne CSV -> raison du rejet attendue (None : ligne valide)
+    ROWS = [
+        ("4,2024-09-14,12:30:00,Southampton,0.8,0,3,2.0,Manchester United", None),
+        ("4,2024-09-14,,Everton,,,,,Fulham", None),
+        (",2024-09-14,15:00,Everton,1.0,1,1,1.0,Fulham", "journée (Wk) manquante ou invalide"),
+        ("4.5,2024-09-14,15:00,Everton,1.0,1,1,1.0,Fulham", "journée (Wk) manquante ou invalide"),
+        ("4,pas-une-date,15:00,Everton,1.0,1,1,1.0,Fulham", "date manquante ou invalide"),
+        ("4,2024-09-14,15:00,,1.0,1,1,1.0,Fulham", "équipe à domicile manquante"),
+        ("4,2024-09-14,15:00,Everton,1.0,1,1,1.0,", "équipe à l'extérieur manquante"),
+        ("4,2024-09-14,15:00,Arsenal,1.0,1,1,1.0,Arsenal", "équipe contre elle-même"),
+        ("4,2024-09-14,15:00,Everton,1.0,x,1,1.0,Fulham", "Score_Home non numérique"),
+        ("4,2024-09-14,15:00,Everton,1.0,1,-1,1.0,Fulham", "Score_Away invalide"),
+        ("4,2024-09-14,15:00,Everton,1.0,1,1.5,1.0,Fulham", "Score_Away invalide"),
+        ("4,2024-09-14,15:00,Everton,abc,1,1,1.0,Fulham", "xG_Home non numérique"),
+        ("4,2024-09-14,25:99,Everton,1.0,1,1,1.0,Fulham", "heure invalide"),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv([row for row, _ in self.ROWS])
+
+    def test_each_invalid_row_is_rejected_with_its_reason(self):
+        valid_df, rejected_df = importer.validate_matches(importer.load_match_data(self.csv_path))
+
+        expected = [(index + 2, reason) for index, (_, reason) in enumerate(self.ROWS) if reason]
+        self.assertEqual(list(zip(rejected_df['Ligne'], rejected_df['Raison'])), expected)
+        self.assertEqual(list(valid_df.index), [0, 1])
+
+    def test_valid_rows_are_converted(self):
+        valid_df, _ = importer.validate_matches(importer.load_match_data(self.csv_path))
+        played, unplayed = valid_df.iloc[0], valid_df.iloc[1]
+
+        self.assertEqual(played['Date'], pd.Timestamp(2024, 9, 14))
+        self.assertEqual((played['Wk'], played['Score_Home'], played['Score_Away']), (4, 0, 3))
+        self.assertEqual((played['xG_Home'], played['xG_Away']), (0.8, 2.0))
+        self.assertEqual(played['Time'], time(12, 30))
+        self.assertEqual(str(valid_df['Score_Home'].dtype), 'Int64')
+        self.assertTrue(pd.isna(unplayed['Score_Home']) and pd.isna(unplayed['xG_Home']))
+        self.assertIsNone(unplayed['Time'])
+
+    def test_rejects_report_lists_the_raw_rows(self):
+        stats = self.run_import()
+        report = pd.read_csv(self.tmp_dir / 'rejected' / f"{self.csv_path.stem}.rejected.csv", dtype=str)
+
+        self.assertEqual(stats['rows_rejected'], len(self.ROWS) - 2)
+        self.assertEqual(Match.objects.count(), 2)
+        self.assertEqual(list(report.columns[[0, -1]]), ['Ligne', 'Raison'])
+        self.assertEqual(report.loc[report['Raison'] == 'heure invalide', 'Time'].tolist(), ['25:99'])
+
+        # Un import propre supprime le rapport précédent
+        self.write_csv(CSV_ROWS)
+        self.run_import()
+        self.assertFalse((self.tmp_dir / 'rejected' / f"{self.csv_path.stem}.rejected.csv").exists())
+
+
+class TeamStandingTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.run_import()
+
+    def standing(self, team_name):
+        return TeamStanding.objects.get(team__team_name=team_name)
+
+    def test_bulk_import_matches_rebuild_verification(self):
+        self.assertEqual(verify_team_standings(), [])
+        call_command('rebuild_standings', verify_only=True, stdout=StringIO())
+        self.assertEqual(self.standing('Arsenal').points, 4)
+
+    def test_delta_on_save_update_and_delete(self):
+        arsenal, chelsea = Team.objects.get(team_name='Arsenal'), Team.objects.get(team_name='Chelsea')
+        day = MatchDay.objects.get(day_number=5)
+
+        match = Match.objects.create(day=day, match_date=day.day_date + timedelta(days=7),
+                                     team_home=arsenal, team_away=chelsea, score_home=2, score_away=1)
+        self.assertEqual(verify_team_standings(), [])
+        self.assertEqual((self.standing('Arsenal').points, self.standing('Arsenal').played), (7, 3))
+
+        match.score_home = 0
+        match.save()
+        self.assertEqual(verify_team_standings(), [])
+        self.assertEqual(self.standing('Arsenal').points, 4)
+        self.assertEqual(self.standing('Chelsea').points, 6)
+
+        match.delete()
+        self.assertEqual(verify_team_standings(), [])
+        self.assertEqual((self.standing('Arsenal').points, self.standing('Chelsea').points), (4, 3))
+
+    def test_missing_row_is_rebuilt_from_matches(self):
+        # Table vidée (ex. avant reconstruction) : une correction de score ne doit pas insérer un delta négatif
+        TeamStanding.objects.all().delete()
+        match = Match.objects.get(team_home__team_name='Manchester City')
+        match.score_home = 1
+        match.save()
+
+        self.assertEqual(TeamStanding.objects.count(), 2)
+        arsenal = self.standing('Arsenal')
+        self.assertEqual((arsenal.played, arsenal.wins, arsenal.draws, arsenal.points), (2, 2, 0, 6))
+        self.assertEqual(self.standing('Manchester City').losses, 1)
+
+
+class StandingsOrderTests(ImportTestCase):
+
+    # Dix équipes à égalité deux à deux sur chaque critère de départage successif
+    ROWS = [
+        "1,2024-08-17,15:00,Arsenal,2.0,4,1,0.5,Everton",
+        "1,2024-08-17,15:00,Brentford,1.5,3,0,0.4,Fulham",
+        "1,2024-08-17,15:00,Chelsea,1.2,2,0,0.3,Leeds United",
+        "1,2024-08-17,15:00,Ipswich Town,0.9,1,0,0.8,Wolverhampton Wanderers",
+        "1,2024-08-17,15:00,Luton Town,1.0,1,1,1.0,Southampton",
+        "2,2024-08-24,15:00,Wolverhampton Wanderers,1.1,1,0,0.7,Ipswich Town",
+        "2,2024-08-24,15:00,Southampton,0.6,0,0,0.6,Luton Town",
+        "3,2024-08-31,15:00,Luton Town,0.4,0,0,0.4,Southampton",
+    ]
+    # Points, différence de buts, buts marqués, victoires, puis nom
+    EXPECTED = ["Arsenal", "Brentford", "Chelsea", "Ipswich Town", "Wolverhampton Wanderers",
+                "Luton Town", "Southampton", "Leeds United", "Everton", "Fulham"]
+
+    def setUp(self):
+        super().setUp()
+        self.write_csv(self.ROWS)
+        self.run_import()
+
+    def test_compute_standings_tie_breakers(self):
+        standings = compute_standings()
+
+        self.assertEqual([row['team_name'] for row in standings], self.EXPECTED)
+        self.assertEqual([row['rank'] for row in standings], list(range(1, 11)))
+        luton = standings[5]
+        self.assertEqual((luton['played'], luton['draws'], luton['points'], luton['goal_difference']), (3, 3, 3, 0))
+        self.assertEqual([row['team_name'] for row in compute_standings(limit=3)], self.EXPECTED[:3])
+
+    def test_league_table_uses_the_same_order(self):
+        table = get_league_table(LeagueSeason.objects.get())
+        self.assertEqual([standing.team.team_name for standing in table], self.EXPECTED)
+
+
+class KeysetPaginationTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.run_import()
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_next_and_previous_round_trip(self):
+        expected = list(Match.objects.order_by('-match_date', '-id').values_list('id', flat=True))
+        pages = [self.get_page('/api/matches/?pagination=cursor&page_size=2')]
+        self.assertIsNone(pages[0]['previous'])
+        while pages[-1]['next']:
+            pages.append(self.get_page(pages[-1]['next']))
+
+        self.assertEqual([row['id'] for page in pages for row in page['results']], expected)
+        self.assertEqual(len(pages), 4)
+
+        # En remontant par les liens previous, on retrouve exactement les mêmes pages
+        page = pages[-1]
+        for expected_page in reversed(pages[:-1]):
+            page = self.get_page(page['previous'])
+            self.assertEqual([row['id'] for row in page['results']],
+                             [row['id'] for row in expected_page['results']])
+        self.assertIsNone(page['previous'])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/matches/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_ordering_is_rejected_in_cursor_mode(self):
+        response = self.client.get('/api/matches/', {'pagination': 'cursor', 'ordering': 'team_home__team_name'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.json())
+
+    def test_search_cursor_links_keep_the_other_parameters(self):
+        request = RequestFactory().get('/search/', {'q': 'man city & co', 'fuzzy': '1', 'count': 'approx',
+                                                    'page': '2', 'cursor': 'old'})
+        html = Template('{% load custom_filters %}{% url_replace cursor="next" page=None %}').render(
+            Context({'request': request}))
+        self.assertEqual(html, '?q=man+city+%26+co&amp;fuzzy=1&amp;count=approx&amp;cursor=next')
+
+
+class ConditionalGetTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.run_import()
+
+    def test_matching_etag_gets_304_without_queries(self):
+        for url in ('/api/matches/?flat=1', '/api/teams/', '/api/matches/standings/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                with self.assertNumQueries(0):
+                    cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_write_changes_the_etag(self):
+        response = self.client.get('/api/teams/')
+        with self.captureOnCommitCallbacks(execute=True):
+            team = Team.objects.get(team_name='Arsenal')
+            team.short_name = 'AFC'
+            team.save()
+
+        fresh = self.client.get('/api/teams/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], response['ETag'])
+
+
+class OverUnderTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.run_import()
+
+    def test_over_under_by_team(self):
+        data = self.client.get('/api/matches/over_under/', {'line': '1.5', 'metric': 'scored'}).json()['data']
+        arsenal = next(row for row in data if row['team_name'] == 'Arsenal')
+        self.assertEqual((arsenal['gp'], arsenal['over'], arsenal['under'], arsenal['pct']), (2, 1, 1, 50.0))
+
+    def test_non_finite_line_is_rejected(self):
+        for line in ('nan', 'inf', '-inf', 'abc'):
+            with self.subTest(line=line):
+                response = self.client.get('/api/matches/over_under/', {'line': line})
+                self.assertEqual(response.status_code, 400)
+
+
+class SearchReindexTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.run_import()
+        patcher = mock.patch('matches.signals.reindex_on_commit')
+        self.reindex = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unchanged_reimport_does_not_reindex(self):
+        self.run_import(force=True)
+        self.reindex.assert_not_called()
+
+    def test_indexed_field_change_reindexes(self):
+        team = Team.objects.get(team_name='Arsenal')
+        team.save()
+        self.reindex.assert_not_called()
+
+        team.short_name = 'AFC'
+        team.save()
+        self.reindex.assert_called_once_with('team', [team.pk])
+
+
+class DataVersionTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.run_import()
+
+    def test_only_real_changes_bump_the_version(self):
+        with mock.patch('matches.signals.bump_data_version') as bump:
+            self.run_import(force=True, bulk=False)
+            team = Team.objects.get(team_name='Arsenal')
+            team.save()
+            bump.assert_not_called()
+
+            team.short_name = 'AFC'
+            team.save()
+            bump.assert_called_once()
+
+
+class ImportCheckpointTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.checkpoint = self.tmp_dir / 'checkpoint.json'
+        self.key = str(self.csv_path.resolve())
+
+    def import_matches(self):
+        out = StringIO()
+        call_command('import_matches', str(self.csv_path), chunksize=3, checkpoint=str(self.checkpoint), stdout=out)
+        return out.getvalue()
+
+    def test_interrupted_import_resumes_after_the_last_committed_chunk(self):
+        real_import = importer.import_csv_streaming
+
+        def crash_after_first_chunk(csv_path, chunksize, start_row=0, on_chunk_committed=None):
+            def commit_then_crash(offset):
+                on_chunk_committed(offset)
+                raise RuntimeError('interruption')
+            return real_import(csv_path, chunksize, start_row=start_row, on_chunk_committed=commit_then_crash)
+
+        with mock.patch('matches.management.commands.import_matches.import_csv_streaming', crash_after_first_chunk):
+            with self.assertRaises(CommandError):
+                self.import_matches()
+        entry = json.loads(self.checkpoint.read_text())['files'][self.key]
+        self.assertEqual((entry['offset'], entry['done']), (3, False))
+        self.assertEqual(Match.objects.count(), 3)
+
+        self.assertIn('resuming after row 3', self.import_matches())
+        self.assertEqual(Match.objects.count(), len(CSV_ROWS))
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_entries_of_other_files_are_kept(self):
+        other = {'file': 'other.csv', 'offset': 2000, 'hash': 'abc', 'done': False}
+        self.checkpoint.write_text(json.dumps({'files': {'/data/other.csv': other}}))
+        self.import_matches()
+
+        self.assertEqual(json.loads(self.checkpoint.read_text()), {'files': {'/data/other.csv': other}})
+
+
+@skipIf(importer.pq is None, "pyarrow n'est pas installé")
+class ColumnarFileTests(ImportTestCase):
+
+    def write_parquet(self, csv_sha1=None):
+        import pyarrow
+
+        table = pyarrow.Table.from_pandas(importer.load_match_data(self.csv_path), preserve_index=False)
+        if csv_sha1:
+            table = table.replace_schema_metadata({**table.schema.metadata, importer.PARQUET_CSV_SHA1_KEY: csv_sha1.encode()})
+        parquet_path = self.csv_path.with_suffix('.parquet')
+        importer.pq.write_table(table, parquet_path)
+        # Parquet écrit avant le CSV : plus ancien, comme avec l'ancien ordre d'export
+        os.utime(parquet_path, (0, 0))
+        return parquet_path
+
+    def test_parquet_with_matching_csv_hash_is_used_even_if_older(self):
+        parquet_path = self.write_parquet(importer._file_sha1(self.csv_path))
+        self.assertEqual(importer.find_columnar_file(self.csv_path), parquet_path)
+
+        self.write_csv(CSV_ROWS[:-1])
+        self.assertIsNone(importer.find_columnar_file(self.csv_path))
+
+    def test_older_parquet_without_hash_is_ignored(self):
+        self.write_parquet()
+        self.assertIsNone(importer.find_columnar_file(self.csv_path))
+
+
+class StreamingSeasonTests(ImportTestCase):
+    csv_name = "Premier-League-2019-2020.csv"
+
+    def setUp(self):
+        super().setUp()
+        # Saison 2019-2020 terminée fin juillet : la date seule la classerait en 2020-2021
+        self.write_csv([
+            "1,2019-08-09,20:00,Liverpool,1.9,4,1,0.6,Norwich City",
+            "38,2020-07-26,16:00,Arsenal,1.1,3,2,0.9,Watford",
+        ])
+
+    def test_stream_and_normal_import_name_the_season_alike(self):
+        importer.import_csv_streaming(self.csv_path, chunksize=1)
+        streamed = list(Season.objects.values_list('season_name', 'start_date', 'end_date'))
+        Season.objects.all().delete()
+        self.run_import(force=True)
+
+        self.assertEqual(streamed, [('2019-2020', date(2019, 8, 9), date(2020, 7, 26))])
+        self.assertEqual(list(Season.objects.values_list('season_name', 'start_date', 'end_date')), streamed)
+
+
+class HeadToHeadTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Arsenal - Manchester City : un nul, une victoire de chaque côté, à domicile comme à l'extérieur
+        self.write_csv(CSV_ROWS + [
+            "6,2024-09-28,17:30,Arsenal,1.8,2,1,1.2,Manchester City",
+            "7,2024-10-05,17:30,Manchester City,2.5,3,0,0.4,Arsenal",
+        ])
+        self.run_import()
+        self.arsenal = Team.objects.get(team_name='Arsenal')
+        self.city = Team.objects.get(team_name='Manchester City')
+
+    def head_to_head(self, team_a, team_b):
+        return self.client.get('/api/matches/head_to_head/', {'team_a': team_a, 'team_b': team_b})
+
+    def test_summary_is_seen_from_team_a(self):
+        data = self.head_to_head(self.arsenal.pk, self.city.pk).json()
+
+        self.assertEqual(data['team_a']['team_name'], 'Arsenal')
+        self.assertEqual(data['summary'], {
+            'matches': 3, 'team_a_wins': 1, 'team_b_wins': 1, 'draws': 1,
+            'team_a_goals': 4, 'team_b_goals': 6, 'team_a_xg': 2.9, 'team_b_xg': 5.8,
+        })
+        self.assertEqual([match['match_date'] for match in data['matches']],
+                         ['2024-10-05', '2024-09-28', '2024-09-22'])
+
+    def test_swapping_the_pair_mirrors_the_summary(self):
+        direct = self.head_to_head(self.arsenal.pk, self.city.pk).json()
+        swapped = self.head_to_head(self.city.pk, self.arsenal.pk).json()
+
+        self.assertEqual(swapped['team_a']['team_name'], 'Manchester City')
+        for key in ('wins', 'goals', 'xg'):
+            self.assertEqual(swapped['summary'][f'team_a_{key}'], direct['summary'][f'team_b_{key}'])
+            self.assertEqual(swapped['summary'][f'team_b_{key}'], direct['summary'][f'team_a_{key}'])
+        self.assertEqual([match['id'] for match in swapped['matches']],
+                         [match['id'] for match in direct['matches']])
+
+    def test_invalid_pairs(self):
+        self.assertEqual(self.head_to_head(self.arsenal.pk, self.arsenal.pk).status_code, 400)
+        self.assertEqual(self.client.get('/api/matches/head_to_head/', {'team_a': self.arsenal.pk}).status_code, 400)
+        self.assertEqual(self.head_to_head(self.arsenal.pk, 0).status_code, 404)
+
+
+class ExportTests(ImportTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Un match sans heure ni xG
+        self.write_csv(CSV_ROWS + ["6,2024-09-28,,Arsenal,,1,0,,Chelsea"])
+        self.run_import()
+        self.season_name = Season.objects.get().season_name
+
+    def export(self, **params):
+        response = self.client.get('/api/matches/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_has_one_flat_object_per_match(self):
+        response, content = self.export()
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(rows), len(CSV_ROWS) + 1)
+        self.assertEqual([row['id'] for row in rows],
+                         list(Match.objects.order_by('match_date', 'id').values_list('id', flat=True)))
+        self.assertEqual(rows[0], {
+            'id': rows[0]['id'], 'match_date': '2024-09-14', 'time': '12:30:00',
+            'league': 'Premier League', 'season': self.season_name, 'day_number': 4,
+            'team_home_id': rows[0]['team_home_id'], 'team_home': 'Southampton',
+            'team_away_id': rows[0]['team_away_id'], 'team_away': 'Manchester United',
+            'score_home': 0, 'score_away': 3, 'xG_home': 0.8, 'xG_away': 2.0,
+        })
+        self.assertEqual((rows[-1]['time'], rows[-1]['score_home'], rows[-1]['xG_away']), (None, 1, None))
+
+    def test_csv_has_a_header_and_empty_missing_values(self):
+        response, content = self.export(output='csv', match_date_after='2024-09-22')
+        lines = content.splitlines()
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(lines[0], 'id,match_date,time,league,season,day_number,team_home_id,team_home,'
+                                   'team_away_id,team_away,score_home,score_away,xG_home,xG_away')
+        self.assertEqual(len(lines), 1 + 3)
+        self.assertTrue(lines[-1].endswith(f',2024-09-28,,Premier League,{self.season_name},6,'
+                                           f'{Team.objects.get(team_name="Arsenal").pk},Arsenal,'
+                                           f'{Team.objects.get(team_name="Chelsea").pk},Chelsea,1,0,,'))
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/api/matches/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
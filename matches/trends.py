@@ -0,0 +1,92 @@
+"""Séries temporelles de buts calculées dans la base (troncature de date + GROUP BY).
+
+    goal_trends(filter_matches(league=1), granularity='week', by_league=True)
+
+Une seule requête renvoie une ligne par période (et par ligue si demandé) ;
+le résultat est mis en tableaux parallèles, directement utilisables par les
+graphiques.
+"""
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+GRANULARITIES = ('day', 'week', 'month', 'season')
+DEFAULT_GRANULARITY = 'month'
+
+_TRUNCATE = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+_LABEL_FORMATS = {'day': '%Y-%m-%d', 'week': '%Y-%m-%d', 'month': '%Y-%m'}
+LEAGUE_NAME = 'day__league_season__league__league_name'
+
+
+def _period_rows(matches, granularity: str, by_league: bool):
+    """Une ligne par période (et ligue) : period, [league], matches, goals"""
+    group_by = [LEAGUE_NAME] if by_league else []
+    if granularity == 'season':
+        rows = matches.annotate(
+            period=F('day__league_season__season__season_name'),
+            period_order=F('day__league_season__season__start_date'),
+        ).values('period', 'period_order', *group_by)
+        ordering = ['period_order', 'period']
+    else:
+        rows = matches.annotate(period=_TRUNCATE[granularity]('match_date')).values('period', *group_by)
+        ordering = ['period']
+    return rows.annotate(
+        matches_count=Count('id'),
+        goals=Sum(F('score_home') + F('score_away')),
+    ).order_by(*ordering, *group_by)
+
+
+def _label(period, granularity: str) -> str:
+    if granularity == 'season':
+        return period
+    return period.strftime(_LABEL_FORMATS[granularity])
+
+
+def goal_trends(matches, granularity: str = DEFAULT_GRANULARITY, by_league: bool = False) -> dict:
+    """
+    Buts et matchs joués par période, en tableaux parallèles
+
+    Returns:
+        {'granularity', 'labels', 'goals', 'matches'} ; avec by_league, 'series'
+        associe en plus à chaque ligue ses buts par période (0 si aucun match)
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    labels, goals, match_counts = [], [], []
+    series = {}
+    index = {}
+    for row in _period_rows(matches.order_by(), granularity, by_league):
+        label = _label(row['period'], granularity)
+        if label not in index:
+            index[label] = len(labels)
+            labels.append(label)
+            goals.append(0)
+            match_counts.append(0)
+        position = index[label]
+        goals[position] += row['goals'] or 0
+        match_counts[position] += row['matches_count']
+        if by_league:
+            league_goals = series.setdefault(row[LEAGUE_NAME], [])
+            league_goals.extend([0] * (position + 1 - len(league_goals)))
+            league_goals[position] += row['goals'] or 0
+
+    result = {'granularity': granularity, 'labels': labels, 'goals': goals, 'matches': match_counts}
+    if by_league:
+        result['series'] = {name: values + [0] * (len(labels) - len(values)) for name, values in series.items()}
+    return result
+
+
+def league_totals(matches) -> dict:
+    """Matchs, buts et moyenne par ligue, groupés dans la base"""
+    rows = (matches.order_by()
+            .values(LEAGUE_NAME)
+            .annotate(matches_count=Count('id'), goals=Sum(F('score_home') + F('score_away')))
+            .order_by(LEAGUE_NAME))
+    return {
+        row[LEAGUE_NAME]: {
+            'matches': row['matches_count'],
+            'goals': row['goals'] or 0,
+            'avg_goals_per_match': round((row['goals'] or 0) / row['matches_count'], 2) if row['matches_count'] else 0,
+        }
+        for row in rows
+    }
@@ -13,10 +13,14 @@ router.register(r'matches', MatchViewSet, basename='match')
 # 'total_goals' endpoint is handled in MatchViewSet as a custom action
 # 'total_goals_home' endpoint is handled in MatchViewSet as a custom action
 # 'total_goals_away' endpoint is handled in MatchViewSet as a custom action
+# 'over_under' endpoint is handled in MatchViewSet as a custom action (total_goals* are aliases)
+# 'export' endpoint (NDJSON / CSV stream) is handled in MatchViewSet as a custom action
+# 'head_to_head' endpoint is handled in MatchViewSet as a custom action
 
 urlpatterns = [
     # path('v1/', views.home_v1, name='home_v1'),
     # path('v2/', views.home_v2, name='home_v2'),
+    # path('v2/feed/', views.home_v2_feed, name='home_v2_feed'),
     # path('search/', views.search_matches, name='search_matches'),
     # path('statistics/', views.statistics, name='statistics'),
     # path('api/statistics/', views.statistics_api, name='statistics_api'),
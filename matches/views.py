@@ -1,39 +1,44 @@
+from bisect import bisect_left
 from datetime import timedelta, date
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-from django.db.models import Q, Sum, Count, F, Case, When, IntegerField
+from django.db.models import Q, Sum, Count, Case, When, IntegerField
+from django.db.models.functions import TruncWeek
 from django.http import JsonResponse
-from .models import Match, Team, League, Season
+from .models import Match, MatchDay, League, Season
+from .caching import get_or_compute, normalize_params
+from .facets import get_search_facets
+from .pagination import approximate_count, keyset_page, wants_cursor_pagination
+from .search import search_matches_queryset
+from .standings import compute_standings, filter_matches
+from .trends import DEFAULT_GRANULARITY, GRANULARITIES, goal_trends, league_totals
+
+def _week_starts():
+    """Lundis des semaines contenant au moins un match, calculés dans la base et mis en cache"""
+    return list(
+        Match.objects.annotate(week_start=TruncWeek('match_date'))
+        .values_list('week_start', flat=True)
+        .distinct()
+        .order_by('week_start')
+    )
+
 
 def home_v1(request):
-    # Récupération de tous les matches triés par date croissante
-    all_matches = Match.objects.all().order_by('match_date')
-    
-    # Calcul des semaines
-    weeks_dict = {}
-    for match in all_matches:
-        # Trouver le lundi de la semaine du match
-        week_start = match.match_date - timedelta(days=match.match_date.weekday())
-        
-        if week_start not in weeks_dict:
-            weeks_dict[week_start] = []
-        weeks_dict[week_start].append(match)
-    
-    # Tri des semaines par date croissante
-    weeks = sorted(weeks_dict.items(), key=lambda x: x[0])
+    # Liste des semaines (un lundi par semaine avec des matchs), recalculée seulement
+    # quand la version des données change
+    weeks = get_or_compute('home_v1_weeks', {}, _week_starts)
 
     # Pagination (1 semaine par page)
     paginator = Paginator(weeks, 1)
     
-    # Trouver la semaine correspondant à aujourd'hui
+    # Trouver la semaine correspondant à aujourd'hui (recherche dichotomique)
     today = date.today()
     today_week_start = today - timedelta(days=today.weekday())
     page_number = 1  # Par défaut, aller à la première page
-
-    # Chercher l'index de la semaine en cours
-    for i, (week_start, _) in enumerate(weeks):
-        if week_start == today_week_start:
-            page_number = i + 1  # Les pages commencent à 1 dans Django
+    index = bisect_left(weeks, today_week_start)
+    if index < len(weeks) and weeks[index] == today_week_start:
+        page_number = index + 1  # Les pages commencent à 1 dans Django
     
     # Récupérer la page demandée ou celle de la semaine actuelle
     requested_page = request.GET.get('page', page_number)
@@ -43,15 +48,17 @@ def home_v1(request):
     except (PageNotAnInteger, EmptyPage):
         page_obj = paginator.page(1)
 
-    # Formatage des données pour le template
+    # Seuls les matchs de la semaine affichée sont lus
     current_week = None
     if page_obj.object_list:
-        week_start, matches = page_obj.object_list[0]
+        week_start = page_obj.object_list[0]
         week_end = week_start + timedelta(days=6)
         current_week = {
             'start': week_start,
             'end': week_end,
-            'matches': sorted(matches, key=lambda m: m.match_date)
+            'matches': Match.objects.select_related(
+                'team_home', 'team_away', 'day__league_season__league'
+            ).filter(match_date__range=(week_start, week_end)).order_by('match_date', 'time'),
         }
     
     context = {
@@ -62,39 +69,89 @@ def home_v1(request):
     
     return render(request, 'home_v1.html', context)
 
+FEED_WINDOW = 3  # Journées affichées de part et d'autre de la semaine courante
+FEED_MAX_WINDOW = 10
+
+
+def _feed_cursor(match_day):
+    """Curseur opaque d'une journée : sa position (date, id) dans le fil"""
+    day_date, day_id = match_day
+    return f"{day_date.isoformat()}_{day_id}"
+
+
+def _parse_feed_cursor(cursor):
+    day_date, _, day_id = cursor.partition('_')
+    return date.fromisoformat(day_date), int(day_id)
+
+
+def _match_days_window(anchor, direction, count, inclusive=False):
+    """
+    Les `count` journées avant ou après `anchor` (date, id), dans l'ordre du fil
+
+    Une journée de plus est lue pour savoir s'il reste des journées au-delà.
+    """
+    day_date, day_id = anchor
+    match_days = MatchDay.objects.order_by()
+    if direction == 'before':
+        match_days = match_days.filter(Q(day_date__lt=day_date) | Q(day_date=day_date, id__lt=day_id))
+        match_days = match_days.order_by('-day_date', '-id')
+    else:
+        id_lookup = 'id__gte' if inclusive else 'id__gt'
+        match_days = match_days.filter(Q(day_date__gt=day_date) | Q(day_date=day_date, **{id_lookup: day_id}))
+        match_days = match_days.order_by('day_date', 'id')
+    window = list(match_days.values_list('day_date', 'id')[:count + 1])
+    has_more = len(window) > count
+    window = window[:count]
+    if direction == 'before':
+        window.reverse()
+    return window, has_more
+
+
+def _feed_matches(window):
+    return list(
+        Match.objects.select_related('team_home', 'team_away', 'day__league_season__league')
+        .filter(day_id__in=[day_id for _, day_id in window])
+        .order_by('match_date', 'time')
+    )
+
+
+def _feed_window_size(request):
+    try:
+        return max(1, min(int(request.GET.get('window', FEED_WINDOW)), FEED_MAX_WINDOW))
+    except ValueError:
+        return FEED_WINDOW
+
+
 def home_v2(request):
     # Déterminer la date du jour et le début de la semaine courante (lundi)
     today = date.today()
     current_week_start = today - timedelta(days=today.weekday())
     current_week_end = current_week_start + timedelta(days=6)
-    
-    # 1. Récupération des matchs de la semaine actuelle
-    current_week_matches = Match.objects.filter(
-        match_date__gte=current_week_start,
-        match_date__lte=current_week_end
-    ).order_by('match_date', 'time')
-    
-    # 2. Récupération des matchs futurs (après la semaine courante)
-    future_matches = Match.objects.filter(
-        match_date__gt=current_week_end
-    ).order_by('match_date', 'time')
-    
-    # 3. Récupération des matchs passés (avant la semaine courante)
-    # Maintenant en ordre chronologique (les plus anciens d'abord)
-    past_matches = Match.objects.filter(
-        match_date__lt=current_week_start
-    ).order_by('match_date', 'time')
-    
-    # Combinaison des résultats dans l'ordre chronologique: passés → semaine actuelle → futurs
-    matches = list(past_matches) + list(current_week_matches) + list(future_matches)
-    
-    # Récupération d'une ligue (pour l'en-tête)
+    window_size = _feed_window_size(request)
+    
+    # Journée d'ancrage : la première à partir de la semaine courante, sinon la dernière
+    anchor = (
+        MatchDay.objects.filter(day_date__gte=current_week_start).order_by('day_date', 'id').values_list('day_date', 'id').first()
+        or MatchDay.objects.order_by('-day_date', '-id').values_list('day_date', 'id').first()
+    )
+    
+    matches = []
+    cursor_before = cursor_after = None
+    if anchor:
+        # Fenêtre de ±N journées autour de l'ancre, tout le reste est chargé à la demande
+        before, has_before = _match_days_window(anchor, 'before', window_size)
+        after, has_after = _match_days_window(anchor, 'after', window_size + 1, inclusive=True)
+        window = before + after
+        matches = _feed_matches(window)
+        cursor_before = _feed_cursor(window[0]) if has_before else None
+        cursor_after = _feed_cursor(window[-1]) if has_after else None
+    
+    # Ligue affichée dans l'en-tête : celle d'un match de la semaine courante si possible
     league = None
-    if current_week_matches.exists():
-        # Privilégier un match de la semaine courante pour la ligue affichée
-        league = current_week_matches.first().day.league_season.league
+    current_week_matches = [m for m in matches if current_week_start <= m.match_date <= current_week_end]
+    if current_week_matches:
+        league = current_week_matches[0].day.league_season.league
     elif matches:
-        # Si pas de match cette semaine, prendre le premier match disponible
         league = matches[0].day.league_season.league
     
     context = {
@@ -102,11 +159,46 @@ def home_v2(request):
         'matches': matches,
         'league': league,
         'current_week_start': current_week_start,
-        'current_week_end': current_week_end
+        'current_week_end': current_week_end,
+        'cursor_before': cursor_before,
+        'cursor_after': cursor_after,
     }
     
     return render(request, 'home_v2.html', context)
 
+
+def home_v2_feed(request):
+    """
+    Fenêtre suivante du fil home_v2 (défilement infini)
+
+    Paramètres : cursor (fourni par la page ou la réponse précédente),
+    direction (before ou after) et window (nombre de journées).
+    Retourne le HTML des cartes et le curseur suivant (null en bout de fil).
+    """
+    direction = request.GET.get('direction', 'after')
+    if direction not in ('before', 'after'):
+        return JsonResponse({'error': 'direction must be before or after'}, status=400)
+    try:
+        anchor = _parse_feed_cursor(request.GET.get('cursor', ''))
+    except ValueError:
+        return JsonResponse({'error': 'invalid cursor'}, status=400)
+    
+    window, has_more = _match_days_window(anchor, direction, _feed_window_size(request))
+    matches = _feed_matches(window)
+    cursor = None
+    if window and has_more:
+        cursor = _feed_cursor(window[0] if direction == 'before' else window[-1])
+    
+    return JsonResponse({
+        'html': render_to_string('partials/match_cards.html', {'matches': matches}, request=request),
+        'cursor': cursor,
+        'count': len(matches),
+    })
+
+
+SEARCH_FILTERS = ('q', 'fuzzy', 'year', 'team', 'league')
+
+
 def search_matches(request):
     # Get search parameters
     query = request.GET.get('q', '')
@@ -119,13 +211,9 @@ def search_matches(request):
         'team_home', 'team_away', 'day__league_season__league', 'day__league_season__season'
     ).all()
     
-    # Apply keyword search
-    if query:
-        matches = matches.filter(
-            Q(team_home__team_name__icontains=query) |
-            Q(team_away__team_name__icontains=query) |
-            Q(day__league_season__league__league_name__icontains=query)
-        )
+    # Apply keyword search (index plein texte FTS5 : préfixes, ou trigrammes avec fuzzy=1)
+    fuzzy = request.GET.get('fuzzy', '') in ('1', 'true', 'on')
+    matches = search_matches_queryset(matches, query, fuzzy=fuzzy)
     
     # Apply year filter
     if year:
@@ -141,134 +229,107 @@ def search_matches(request):
     if league:
         matches = matches.filter(day__league_season__league__id=league)
     
-    # Order results by date
-    matches = matches.order_by('-match_date', 'time')
-    
-    # Pagination
-    paginator = Paginator(matches, 20)  # 20 matches per page
-    page = request.GET.get('page')
-    try:
-        matches_page = paginator.page(page)
-    except PageNotAnInteger:
-        matches_page = paginator.page(1)
-    except EmptyPage:
-        matches_page = paginator.page(paginator.num_pages)
-    
-    # Get filter options for the search form
-    years = Match.objects.dates('match_date', 'year').values_list('match_date__year', flat=True).distinct().order_by('-match_date__year')
-    teams = Team.objects.all().order_by('team_name')
-    leagues = League.objects.all().order_by('league_name')
+    # Filter options for the search form (en cache par version des données),
+    # avec le nombre de matchs de chaque valeur pour la recherche en cours
+    search_params = normalize_params(request.GET, SEARCH_FILTERS)
+    facets = get_search_facets(matches, search_params)
+    
+    next_cursor = previous_cursor = None
+    if wants_cursor_pagination(request):
+        # Pagination par curseur sur (match_date, id) : ni COUNT ni OFFSET,
+        # total approximatif (en cache) seulement avec count=approx
+        try:
+            matches_page, next_cursor, previous_cursor = keyset_page(matches, request.GET.get('cursor'), 20)
+        except ValueError:
+            matches_page, next_cursor, previous_cursor = keyset_page(matches, None, 20)
+        total_results = approximate_count(matches, search_params) if request.GET.get('count') == 'approx' else None
+    else:
+        # Order results by date
+        matches = matches.order_by('-match_date', 'time')
+        
+        # Pagination
+        paginator = Paginator(matches, 20)  # 20 matches per page
+        page = request.GET.get('page')
+        try:
+            matches_page = paginator.page(page)
+        except PageNotAnInteger:
+            matches_page = paginator.page(1)
+        except EmptyPage:
+            matches_page = paginator.page(paginator.num_pages)
+        total_results = paginator.count
     
     context = {
         'page_title': 'Search Results',
         'matches': matches_page,
         'query': query,
+        'fuzzy': fuzzy,
         'selected_year': year,
         'selected_team': team,
         'selected_league': league,
-        'years': years,
-        'teams': teams,
-        'leagues': leagues,
-        'total_results': paginator.count,
+        'years': facets['years'],
+        'teams': facets['teams'],
+        'leagues': facets['leagues'],
+        'total_results': total_results,
+        'next_cursor': next_cursor,
+        'previous_cursor': previous_cursor,
     }
     
     return render(request, 'search_results.html', context)
 
 
+STATISTICS_FILTERS = ('league', 'season', 'date_from', 'date_to')
+
+
+def _filtered_matches(filters):
+    """Matchs joués correspondant aux filtres normalisés des statistiques"""
+    return filter_matches(
+        Match.objects.select_related(
+            'team_home', 'team_away', 'day__league_season__league', 'day__league_season__season'
+        ),
+        league=filters.get('league'), season=filters.get('season'),
+        date_from=filters.get('date_from'), date_to=filters.get('date_to'),
+    )
+
+
+def _monthly_goals(matches):
+    # Monthly goal trends, groupés par mois dans la base
+    trend = goal_trends(matches, 'month')
+    return list(zip(trend['labels'], trend['goals']))
+
+
+def _statistics_data(filters):
+    """Données calculées du tableau de bord (mises en cache par version des données)"""
+    matches = _filtered_matches(filters)
+    
+    # Classement de toutes les équipes en une seule requête groupée
+    sorted_teams = [
+        (row['team_name'], {
+            **row,
+            'matches_played': row['played'],
+            'goals_scored': row['goals_for'],
+        })
+        for row in compute_standings(matches)
+    ]
+    
+    # League statistics (matchs, buts, moyenne) groupées dans la base
+    league_stats = league_totals(matches)
+    
+    return {
+        'team_stats': sorted_teams,
+        'league_stats': league_stats,
+        'monthly_goals': _monthly_goals(matches),
+        'total_matches': matches.count(),
+        'total_goals': matches.aggregate(total=Sum('score_home') + Sum('score_away'))['total'] or 0,
+    }
+
+
 def statistics(request):
     """
     Statistics dashboard view with interactive charts and filters
     """
     # Get filter parameters
-    league_id = request.GET.get('league', '')
-    season_id = request.GET.get('season', '')
-    date_from = request.GET.get('date_from', '')
-    date_to = request.GET.get('date_to', '')
-    
-    # Base queryset
-    matches = Match.objects.select_related(
-        'team_home', 'team_away', 'day__league_season__league', 'day__league_season__season'
-    ).all()
-    
-    # Apply filters
-    if league_id:
-        matches = matches.filter(day__league_season__league__id=league_id)
-    if season_id:
-        matches = matches.filter(day__league_season__season__id=season_id)
-    if date_from:
-        matches = matches.filter(match_date__gte=date_from)
-    if date_to:
-        matches = matches.filter(match_date__lte=date_to)
-    
-    # Only include matches with results
-    matches = matches.filter(score_home__isnull=False, score_away__isnull=False)
-    
-    # Calculate team statistics
-    team_stats = {}
-    
-    # Get all teams that played in filtered matches
-    teams = set()
-    for match in matches:
-        teams.add(match.team_home)
-        teams.add(match.team_away)
-    
-    for team in teams:
-        # Home matches
-        home_matches = matches.filter(team_home=team)
-        home_goals = home_matches.aggregate(total=Sum('score_home'))['total'] or 0
-        home_wins = home_matches.filter(score_home__gt=F('score_away')).count()
-        home_draws = home_matches.filter(score_home=F('score_away')).count()
-        home_losses = home_matches.filter(score_home__lt=F('score_away')).count()
-        
-        # Away matches
-        away_matches = matches.filter(team_away=team)
-        away_goals = away_matches.aggregate(total=Sum('score_away'))['total'] or 0
-        away_wins = away_matches.filter(score_away__gt=F('score_home')).count()
-        away_draws = away_matches.filter(score_away=F('score_home')).count()
-        away_losses = away_matches.filter(score_away__lt=F('score_home')).count()
-        
-        # Combined statistics
-        team_stats[team.team_name] = {
-            'team': team,
-            'matches_played': home_matches.count() + away_matches.count(),
-            'goals_scored': home_goals + away_goals,
-            'wins': home_wins + away_wins,
-            'draws': home_draws + away_draws,
-            'losses': home_losses + away_losses,
-            'points': (home_wins + away_wins) * 3 + (home_draws + away_draws)
-        }
-    
-    # Sort teams by points
-    sorted_teams = sorted(team_stats.items(), key=lambda x: x[1]['points'], reverse=True)
-    
-    # League statistics
-    league_stats = {}
-    for match in matches:
-        league_name = match.day.league_season.league.league_name
-        if league_name not in league_stats:
-            league_stats[league_name] = {
-                'matches': 0,
-                'goals': 0,
-                'avg_goals_per_match': 0
-            }
-        league_stats[league_name]['matches'] += 1
-        league_stats[league_name]['goals'] += match.score_home + match.score_away
-    
-    # Calculate averages
-    for league_name, stats in league_stats.items():
-        if stats['matches'] > 0:
-            stats['avg_goals_per_match'] = round(stats['goals'] / stats['matches'], 2)
-    
-    # Monthly goal trends
-    monthly_goals = {}
-    for match in matches:
-        month_key = match.match_date.strftime('%Y-%m')
-        if month_key not in monthly_goals:
-            monthly_goals[month_key] = 0
-        monthly_goals[month_key] += match.score_home + match.score_away
-    
-    # Sort monthly data
-    sorted_monthly = sorted(monthly_goals.items())
+    filters = normalize_params(request.GET, STATISTICS_FILTERS)
+    data = get_or_compute('statistics', filters, lambda: _statistics_data(filters))
     
     # Get filter options
     leagues = League.objects.all().order_by('league_name')
@@ -276,66 +337,49 @@ def statistics(request):
     
     context = {
         'page_title': 'Statistics Dashboard',
-        'team_stats': sorted_teams,
-        'league_stats': league_stats,
-        'monthly_goals': sorted_monthly,
+        **data,
         'leagues': leagues,
         'seasons': seasons,
-        'selected_league': league_id,
-        'selected_season': season_id,
-        'selected_date_from': date_from,
-        'selected_date_to': date_to,
-        'total_matches': matches.count(),
-        'total_goals': matches.aggregate(total=Sum('score_home') + Sum('score_away'))['total'] or 0,
+        'selected_league': filters.get('league', ''),
+        'selected_season': filters.get('season', ''),
+        'selected_date_from': filters.get('date_from', ''),
+        'selected_date_to': filters.get('date_to', ''),
     }
     
     return render(request, 'statistics.html', context)
 
 
+def _statistics_api_data(filters):
+    matches = _filtered_matches(filters)
+    granularity = filters.get('granularity', DEFAULT_GRANULARITY)
+    
+    # Team goals data for chart
+    sorted_team_goals = sorted(
+        ((row['team_name'], row['goals_for']) for row in compute_standings(matches)),
+        key=lambda x: x[1], reverse=True
+    )
+    
+    # Tendance des buts par période (une requête), en tableaux parallèles
+    trend = goal_trends(matches, granularity, by_league=filters.get('by_league') in ('1', 'true'))
+    data = {
+        'team_goals': sorted_team_goals,
+        'trend': trend,
+        'league_stats': league_totals(matches),
+    }
+    if granularity == 'month':
+        data['monthly_goals'] = list(zip(trend['labels'], trend['goals']))
+    return data
+
+
 def statistics_api(request):
     """
     API endpoint for chart data
+
+    Paramètres : league, season, date_from, date_to, granularity (day, week,
+    month ou season ; month par défaut) et by_league=1 pour une série par ligue.
     """
     # Get filter parameters
-    league_id = request.GET.get('league', '')
-    season_id = request.GET.get('season', '')
-    
-    # Base queryset
-    matches = Match.objects.select_related(
-        'team_home', 'team_away', 'day__league_season__league', 'day__league_season__season'
-    ).filter(score_home__isnull=False, score_away__isnull=False)
-    
-    # Apply filters
-    if league_id:
-        matches = matches.filter(day__league_season__league__id=league_id)
-    if season_id:
-        matches = matches.filter(day__league_season__season__id=season_id)
-    
-    # Team goals data for chart
-    team_goals = {}
-    teams = set()
-    
-    for match in matches:
-        teams.add(match.team_home)
-        teams.add(match.team_away)
-    
-    for team in teams:
-        home_goals = matches.filter(team_home=team).aggregate(total=Sum('score_home'))['total'] or 0
-        away_goals = matches.filter(team_away=team).aggregate(total=Sum('score_away'))['total'] or 0
-        team_goals[team.team_name] = home_goals + away_goals
-    
-    # Sort by goals
-    sorted_team_goals = sorted(team_goals.items(), key=lambda x: x[1], reverse=True)
-    
-    # Monthly goals for line chart
-    monthly_goals = {}
-    for match in matches:
-        month_key = match.match_date.strftime('%Y-%m')
-        if month_key not in monthly_goals:
-            monthly_goals[month_key] = 0
-        monthly_goals[month_key] += match.score_home + match.score_away
-    
-    return JsonResponse({
-        'team_goals': sorted_team_goals,
-        'monthly_goals': sorted(monthly_goals.items())
-    })
\ No newline at end of file
+    filters = normalize_params(request.GET, STATISTICS_FILTERS + ('granularity', 'by_league'))
+    if filters.get('granularity', DEFAULT_GRANULARITY) not in GRANULARITIES:
+        return JsonResponse({'error': f"granularity must be one of {', '.join(GRANULARITIES)}"}, status=400)
+    return JsonResponse(get_or_compute('statistics_api', filters, lambda: _statistics_api_data(filters)))
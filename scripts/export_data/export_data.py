@@ -1,3 +1,4 @@
+import hashlib
 import os
 import sys
 import yaml
@@ -6,6 +7,15 @@ import pandas as pd
 from pathlib import Path
 from loguru import logger
 
+try:
+    import pyarrow  # Moteur Parquet optionnel
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Métadonnée Parquet lue par matches.importer.find_columnar_file : SHA-1 du CSV exporté avec lui
+PARQUET_CSV_SHA1_KEY = b"football_history.csv_sha1"
+
 def load_config(config_path="config.yaml"):
     """
     Charge la configuration depuis un fichier YAML.
@@ -35,6 +45,8 @@ def parse_arguments():
     parser.add_argument("--url", help="URL de la page FBref à traiter")
     parser.add_argument("--config", default="config.yaml", help="Chemin vers le fichier de configuration")
     parser.add_argument("--verbose", action="store_true", help="Mode verbeux")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default=None,
+                        help="Format de sortie (csv, parquet typé ou les deux)")
     return parser.parse_args()
 
 # Charger les arguments de ligne de commande
@@ -55,6 +67,8 @@ TEAM_NAME_CORRECTIONS = CONFIG["team_name_corrections"]
 # Définir le répertoire de base et les répertoires des fichiers
 BASE_DIR = Path(__file__).parent.parent.parent
 CSV_DIR = BASE_DIR / CONFIG["paths"]["csv_dir"]
+PARQUET_DIR = BASE_DIR / CONFIG["paths"].get("parquet_dir", "data/raw/parquet")
+OUTPUT_FORMAT = args.format or CONFIG.get("output", {}).get("format", "csv")
 LOG_DIR = Path(__file__).parent / CONFIG["paths"]["logs_dir"]
 
 # Créer les répertoires s'ils n'existent pas
@@ -288,23 +302,74 @@ def save_to_csv(df, filename):
     Args:
         df (pd.DataFrame): Le DataFrame à sauvegarder.
         filename (str): Le nom du fichier CSV.
+
+    Returns:
+        Path: Le chemin du fichier écrit.
     """
     csv_path = CSV_DIR / filename
     logger.info(f"Sauvegarde des données dans {csv_path}")
     try:
         df.to_csv(csv_path, index=False)
         logger.success(f"Données sauvegardées avec succès dans {csv_path}")
+        return csv_path
     except Exception as e:
         logger.error(f"Erreur lors de la sauvegarde des données: {e}")
         raise IOError(f"Erreur lors de la sauvegarde des données: {e}")
 
 
-def process_fbref_data(url):
+def file_sha1(path):
+    """SHA-1 du contenu d'un fichier, lu par blocs."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_to_parquet(df, filename, csv_sha1=None):
+    """
+    Sauvegarde le DataFrame au format Parquet en conservant les types.
+
+    Les types appliqués par clean_and_transform_data (Int64, float64, dates)
+    sont conservés : l'import relit le fichier sans reconvertir les colonnes.
+
+    Args:
+        df (pd.DataFrame): Le DataFrame à sauvegarder.
+        filename (str): Le nom du fichier CSV correspondant.
+        csv_sha1 (str): Empreinte du CSV écrit avec ce Parquet, enregistrée dans
+            ses métadonnées : l'import ignore le Parquet si le CSV change ensuite.
+
+    Returns:
+        bool: True si le fichier a été écrit, False si pyarrow n'est pas installé.
+    """
+    if pyarrow is None:
+        logger.warning("pyarrow n'est pas installé : export Parquet ignoré")
+        return False
+
+    PARQUET_DIR.mkdir(exist_ok=True, parents=True, mode=0o755)
+    parquet_path = PARQUET_DIR / Path(filename).with_suffix('.parquet').name
+    logger.info(f"Sauvegarde des données typées dans {parquet_path}")
+    try:
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        if csv_sha1:
+            metadata = {**(table.schema.metadata or {}), PARQUET_CSV_SHA1_KEY: csv_sha1.encode()}
+            table = table.replace_schema_metadata(metadata)
+        pyarrow.parquet.write_table(table, parquet_path)
+        logger.success(f"Données sauvegardées avec succès dans {parquet_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de la sauvegarde Parquet: {e}")
+        raise IOError(f"Erreur lors de la sauvegarde Parquet: {e}")
+
+
+def process_fbref_data(url, output_format=OUTPUT_FORMAT):
     """
     Traite les données FBref à partir de l'URL donnée et les sauvegarde dans un fichier CSV.
 
     Args:
         url (str): L'URL de la page FBref contenant les scores et les matchs.
+        output_format (str): 'csv', 'parquet' ou 'both'. Le CSV est toujours
+            écrit si l'export Parquet est impossible.
 
     Returns:
         pd.DataFrame: Le DataFrame traité.
@@ -317,7 +382,14 @@ def process_fbref_data(url):
     
     # Générer le nom du fichier CSV et sauvegarder les données
     csv_filename = generate_csv_filename(url, cleaned_data)
-    save_to_csv(cleaned_data, csv_filename)
+    # CSV d'abord : son empreinte accompagne le Parquet écrit ensuite
+    csv_sha1 = None
+    if output_format in ("csv", "both"):
+        csv_sha1 = file_sha1(save_to_csv(cleaned_data, csv_filename))
+    if output_format in ("parquet", "both"):
+        parquet_saved = save_to_parquet(cleaned_data, csv_filename, csv_sha1=csv_sha1)
+        if not parquet_saved and csv_sha1 is None:
+            save_to_csv(cleaned_data, csv_filename)
     
     logger.success(f"Traitement terminé pour {url}")
     return cleaned_data